@@ -6,5 +6,6 @@ cmd="$@"
 
 uv run ./manage.py collectstatic --noinput
 uv run ./manage.py migrate
+uv run ./manage.py createcachetable
 
 exec uv run $cmd
@@ -0,0 +1,185 @@
+# ruff: noqa: INP001
+"""Benchmark Require2FAMiddleware end to end under uvicorn.
+
+Starts ``config.asgi:application`` under uvicorn for the working tree and,
+with ``--baseline``, for another git revision checked out into a temporary
+worktree, then drives the same authenticated URL against each server over
+keep-alive connections and reports requests per second.
+
+Both servers share the database and settings given by the environment, so
+run it with the same variables as the app (``DATABASE_URL``, ``SECRET_KEY``,
+...) and an existing user. uvicorn is not a project dependency::
+
+    pip install uvicorn
+    python scripts/benchmark_require2fa.py --baseline <commit before the change> --requests 5000 --concurrency 100
+
+The numbers include the whole request path (session, auth, the view), so
+compare the two runs with each other, not with other benchmarks.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = REPO_DIR / "src"
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. the commit before a change.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per server.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Keep-alive connections in flight at once.")
+    parser.add_argument("--path", default="/", help="Request path.")
+    parser.add_argument("--username", help="User to send requests as (default: the first user).")
+    parser.add_argument("--port", type=int, default=8765, help="Port the servers listen on.")
+    return parser.parse_args()
+
+
+def session_cookie(username: str | None) -> str:
+    """Log the user in through the session backend and return the Cookie header value."""
+    sys.path.insert(0, str(SRC_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    import django  # noqa: PLC0415
+
+    django.setup()
+
+    from django.conf import settings  # noqa: PLC0415
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model  # noqa: PLC0415
+
+    users = get_user_model().objects.order_by("pk")
+    if username:
+        users = users.filter(username=username)
+    user = users.first()
+    if user is None:
+        sys.exit("No user to benchmark with, create one first.")
+
+    session = importlib.import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+@contextmanager
+def checkout(revision: str):  # noqa: ANN201
+    """Check ``revision`` out into a temporary git worktree and yield its src directory."""
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as tmp:
+        worktree = Path(tmp) / "tree"
+        subprocess.run(["git", "worktree", "add", "--detach", str(worktree), revision], cwd=REPO_DIR, check=True)  # noqa: S603, S607
+        try:
+            yield worktree / "src"
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(worktree)], cwd=REPO_DIR, check=True)  # noqa: S603, S607
+
+
+@contextmanager
+def server(src_dir: Path, port: int):  # noqa: ANN201
+    """Run uvicorn for the app in ``src_dir`` until the block exits."""
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "uvicorn", "config.asgi:application", "--port", str(port), "--no-access-log"],
+        cwd=src_dir,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    sys.exit("uvicorn did not start")
+                time.sleep(0.2)
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    """Read one HTTP/1.1 response, body included, off a keep-alive connection; return its status."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                return status
+    else:
+        await reader.readexactly(int(headers.get(b"content-length", b"0")))
+    return status
+
+
+async def load(port: int, path: str, cookie: str, requests: int, concurrency: int) -> tuple[float, int]:
+    """Send ``requests`` GETs over ``concurrency`` connections.
+
+    Return the elapsed seconds and the number of server errors.
+    """
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n\r\n".encode()
+    remaining = requests
+    errors = 0
+
+    async def connection() -> None:
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                writer.write(request)
+                if await read_response(reader) >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return time.perf_counter() - start, errors
+
+
+def measure(src_dir: Path, args: argparse.Namespace, cookie: str) -> str:
+    """Return the throughput of the app in ``src_dir``, formatted for the report."""
+    with server(src_dir, args.port):
+        # warm up caches and connections before measuring
+        asyncio.run(load(args.port, args.path, cookie, args.concurrency, args.concurrency))
+        elapsed, errors = asyncio.run(load(args.port, args.path, cookie, args.requests, args.concurrency))
+    report = f"{args.requests / elapsed:10.1f} req/s"
+    if errors:
+        report += f", {errors} server errors (check the server log)"
+    return report
+
+
+def main() -> None:
+    """Benchmark the working tree, and the baseline revision if one was given."""
+    args = parse_args()
+    cookie = session_cookie(args.username)
+    sys.stdout.write(f"path={args.path} requests={args.requests} concurrency={args.concurrency}\n")
+
+    if args.baseline:
+        with checkout(args.baseline) as baseline_src:
+            report = measure(baseline_src, args, cookie)
+        sys.stdout.write(f"baseline: {report} ({args.baseline})\n")
+
+    report = measure(SRC_DIR, args, cookie)
+    sys.stdout.write(f" current: {report} (working tree)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 """Admin module for the myapp app."""
 
+from .circuit_breakers import CircuitBreakerAdmin
 from .site_configuation import SiteConfigurationAdmin
 from .worker_configurations import WorkerConfigurationAdmin
 from .worker_errors import WorkerErrorAdmin
 
 __all__ = [
+    "CircuitBreakerAdmin",
     "SiteConfigurationAdmin",
     "WorkerConfigurationAdmin",
     "WorkerErrorAdmin",
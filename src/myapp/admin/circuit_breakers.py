@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from myapp.models import CircuitBreaker
+
+
+@admin.register(CircuitBreaker)
+class CircuitBreakerAdmin(admin.ModelAdmin):
+    """Circuit breaker admin; set the state to Closed to resume calls at once."""
+
+    list_display = (
+        "name",
+        "state",
+        "failures",
+        "failure_threshold",
+        "open_seconds",
+        "opened_at",
+        "last_failure_at",
+    )
+    list_editable = ("state",)
+    list_filter = ("state",)
+    readonly_fields = ("failures", "opened_at", "last_failure_at", "last_error")
@@ -11,10 +11,24 @@ class WorkerConfigurationAdmin(admin.ModelAdmin):
         "name",
         "is_enabled",
         "sleep_seconds",
+        "max_sleep_seconds",
         "log_level",
+        "last_heartbeat_at",
+        "last_run_duration",
+        "items_per_second",
+        "run_latency_p50",
+        "run_latency_p95",
     )
     list_editable = (
         "is_enabled",
         "sleep_seconds",
+        "max_sleep_seconds",
         "log_level",
     )
+    readonly_fields = (
+        "last_heartbeat_at",
+        "last_run_duration",
+        "items_per_second",
+        "run_latency_p50",
+        "run_latency_p95",
+    )
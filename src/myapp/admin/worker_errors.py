@@ -10,8 +10,12 @@ class WorkerErrorAdmin(admin.ModelAdmin):
     list_display = (
         "worker",
         "created_at",
+        "last_seen_at",
+        "occurrences",
         "error_status",
     )
     list_filter = ("error_status",)
     search_fields = ("error",)
-    readonly_fields = ("worker", "error", "created_at")
+    readonly_fields = ("worker", "error", "created_at", "last_seen_at", "occurrences")
+    # a filtered list would also count all worker errors, which keep growing until prune_records runs
+    show_full_result_count = False
@@ -5,3 +5,10 @@ class MyappConfig(AppConfig):
     """App configuration."""
 
     name = "myapp"
+
+    def ready(self) -> None:
+        """Connect the cache invalidation signals and wake workers on configuration changes."""
+        from . import signals  # noqa: F401, PLC0415
+        from .notifications import notify_on_save  # noqa: PLC0415
+
+        notify_on_save(self.get_model("WorkerConfiguration"))
@@ -0,0 +1,332 @@
+"""Two-tier cache backend: a bounded per-process LRU in front of a shared cache.
+
+Reads are served from process memory while the entry is fresh, so hot keys
+cost neither a network round trip nor a SQL query. Writes go through to the
+shared cache. Invalidation is broadcast through a generation counter kept in
+the shared tier:
+
+* ``delete()``, ``delete_many()`` and ``incr()`` bump the counter and record
+  the keys they invalidated under the new generation. Every process notices
+  the new generation within ``GENERATION_CHECK_INTERVAL`` seconds and drops
+  just those keys from its local tier. A process that has fallen more than
+  ``MAX_INVALIDATION_LAG`` generations behind, or finds a record expired,
+  drops its whole local tier instead.
+* ``clear()`` starts a new generation sequence, so every process drops its
+  whole local tier.
+* ``set()`` is visible to other processes within ``LOCAL_TIMEOUT`` seconds,
+  the longest a process trusts a local entry.
+
+Counters are cached locally like any other value, so another process reads
+a new count within ``GENERATION_CHECK_INTERVAL`` seconds of the ``incr()``.
+
+With a shared tier whose ``incr()`` is not atomic (``DatabaseCache``,
+``FileBasedCache``), two invalidations can get the same generation. Only one
+of them can record its keys under it; the other starts a new generation
+sequence, so every process drops its whole local tier rather than keep a key
+that was invalidated.
+
+Configure it in ``CACHES`` with the alias of the shared tier::
+
+    CACHES = {
+        "default": {
+            "BACKEND": "myapp.cache.TieredCache",
+            "LOCATION": "default",
+            "OPTIONS": {"SHARED": "shared"},
+        },
+        "shared": {"BACKEND": "django.core.cache.backends.redis.RedisCache", ...},
+    }
+
+Any Django backend works as the shared tier. ``FileBasedCache`` is a
+stand-in for local development and tests, since it is shared between
+processes on one host without an extra service.
+"""
+
+from __future__ import annotations
+
+# the local tier only unpickles what this process pickled, see _LocalTier
+import pickle  # nosec B403
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connection, transaction
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+GENERATION_KEY = "tiered-cache:generation"
+INVALIDATED_KEY = "tiered-cache:invalidated:{generation}"
+
+# generations a process may fall behind and still catch up key by key
+MAX_INVALIDATION_LAG = 100
+# seconds the keys invalidated by a generation are kept for other processes to read
+INVALIDATED_TIMEOUT = 60
+
+DEFAULT_LOCAL_MAX_ENTRIES = 1000
+DEFAULT_LOCAL_TIMEOUT = 5
+DEFAULT_GENERATION_CHECK_INTERVAL = 1
+
+_MISSING = object()
+
+
+def can_cache_reads() -> bool:
+    """Return True if values read now may be published to a cache.
+
+    A value read inside an atomic block may be an uncommitted write that is
+    later rolled back, so it must never be cached.
+    """
+    return not connection.in_atomic_block
+
+
+def clear_now_and_on_commit(clear: Callable[[], None]) -> None:
+    """Call ``clear`` now, and again once the current transaction commits.
+
+    For the signal receivers of cached models. Clearing now covers the
+    writer's own later reads; clearing on commit drops whatever a request
+    that read the old row before the commit cached in the meantime.
+    """
+    clear()
+    transaction.on_commit(clear)
+
+
+class _LocalTier:
+    """Thread-safe LRU with per-entry expiry, shared by all threads of a process.
+
+    Values are pickled on the way in, like ``LocMemCache`` does, so callers
+    never share mutable objects. The pickles never leave process memory.
+    """
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation: int | None = None
+        self.checked_at = 0.0
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[1] <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+        # pickled by set() in this process, never read from outside it
+        return pickle.loads(entry[0])  # noqa: S301  # nosec B301
+
+    def set(self, key: str, value: Any, timeout: float, max_entries: int) -> None:  # noqa: ANN401
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (pickled, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+# one local tier per LOCATION, like LocMemCache
+_local_tiers: dict[str, _LocalTier] = {}
+_local_tiers_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """Per-process LRU in front of a shared cache, with broadcast invalidation."""
+
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        """Set up the local tier for ``location`` and remember the shared alias."""
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+
+        self._shared_alias = options["SHARED"]
+        self._local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", DEFAULT_LOCAL_MAX_ENTRIES))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", DEFAULT_LOCAL_TIMEOUT))
+        self._check_interval = float(options.get("GENERATION_CHECK_INTERVAL", DEFAULT_GENERATION_CHECK_INTERVAL))
+
+        with _local_tiers_lock:
+            self._local = _local_tiers.setdefault(location, _LocalTier())
+
+    @property
+    def shared(self) -> BaseCache:
+        """Return the shared tier (connections are per thread, so look it up each time)."""
+        return caches[self._shared_alias]
+
+    # generation handling
+
+    def _generation_due(self) -> bool:
+        return time.monotonic() - self._local.checked_at >= self._check_interval
+
+    def _invalidated_keys(self, generation: int) -> list[str] | None:
+        """Return the shared keys recording what was invalidated since the local generation.
+
+        None means the local tier is too far behind to catch up key by key.
+        """
+        known = self._local.generation
+        if known is None or not 0 <= generation - known <= MAX_INVALIDATION_LAG:
+            return None
+        return [INVALIDATED_KEY.format(generation=number) for number in range(known + 1, generation + 1)]
+
+    def _apply_generation(self, generation: int, records: list[str] | None, invalidated: dict[str, Any]) -> None:
+        """Drop the local entries invalidated by other processes since the last check."""
+        if records is None or len(invalidated) < len(records):
+            self._local.clear()
+        else:
+            for keys in invalidated.values():
+                self._local.delete(*keys)
+        self._local.generation = generation
+        self._local.checked_at = time.monotonic()
+
+    def _seed_generation(self) -> int:
+        # seeded from the clock so a cleared shared tier never repeats an old value
+        self.shared.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        return self.shared.get(GENERATION_KEY, 0)
+
+    def _check_generation(self) -> None:
+        if self._generation_due():
+            generation = self.shared.get(GENERATION_KEY)
+            if generation is None:
+                generation = self._seed_generation()
+            records = self._invalidated_keys(generation)
+            invalidated = self.shared.get_many(records) if records else {}
+            self._apply_generation(generation, records, invalidated)
+
+    async def _acheck_generation(self) -> None:
+        if self._generation_due():
+            generation = await self.shared.aget(GENERATION_KEY)
+            if generation is None:
+                generation = await sync_to_async(self._seed_generation)()
+            records = self._invalidated_keys(generation)
+            invalidated = await self.shared.aget_many(records) if records else {}
+            self._apply_generation(generation, records, invalidated)
+
+    def _invalidate(self, keys: list[str]) -> None:
+        """Drop ``keys`` (already made) locally and have every other process drop them too."""
+        self._local.delete(*keys)
+        try:
+            generation = self.shared.incr(GENERATION_KEY)
+        except ValueError:
+            # a new sequence: every process drops its whole local tier
+            self._seed_generation()
+        else:
+            record = INVALIDATED_KEY.format(generation=generation)
+            if not self.shared.add(record, keys, timeout=INVALIDATED_TIMEOUT):
+                # another invalidation got the same generation from a non-atomic incr
+                self.shared.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+    def _local_set(self, key: str, value: Any, timeout: float | None = DEFAULT_TIMEOUT) -> None:  # noqa: ANN401
+        local_timeout = self._local_timeout
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        if local_timeout > 0:
+            self._local.set(key, value, local_timeout, self._local_max_entries)
+
+    # cache API
+
+    def get(self, key: str, default: Any = None, version: int | None = None) -> Any:  # noqa: ANN401
+        """Return the local copy if fresh, otherwise read through the shared tier."""
+        local_key = self.make_and_validate_key(key, version=version)
+        self._check_generation()
+
+        value = self._local.get(local_key)
+        if value is not _MISSING:
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+
+        self._local_set(local_key, value)
+        return value
+
+    async def aget(self, key: str, default: Any = None, version: int | None = None) -> Any:  # noqa: ANN401
+        """Async get; a fresh local hit is answered without leaving the event loop."""
+        local_key = self.make_and_validate_key(key, version=version)
+        await self._acheck_generation()
+
+        value = self._local.get(local_key)
+        if value is not _MISSING:
+            return value
+
+        value = await self.shared.aget(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+
+        self._local_set(local_key, value)
+        return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,  # noqa: ANN401
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> None:
+        """Write through to the shared tier and keep a local copy."""
+        local_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(local_key, value, timeout)
+
+    def add(
+        self,
+        key: str,
+        value: Any,  # noqa: ANN401
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> bool:
+        """Add to the shared tier; keep a local copy only if the key was new."""
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(local_key, value, timeout)
+        return added
+
+    def touch(self, key: str, timeout: float | None = DEFAULT_TIMEOUT, version: int | None = None) -> bool:
+        """Update the expiry in the shared tier."""
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def incr(self, key: str, delta: int = 1, version: int | None = None) -> int:
+        """Increment in the shared tier and drop the old count from every local tier."""
+        value = self.shared.incr(key, delta, version=version)
+        self._invalidate([self.make_and_validate_key(key, version=version)])
+        return value
+
+    def has_key(self, key: str, version: int | None = None) -> bool:
+        """Return True if the key is in either tier."""
+        local_key = self.make_and_validate_key(key, version=version)
+        self._check_generation()
+        if self._local.get(local_key) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def delete(self, key: str, version: int | None = None) -> bool:
+        """Delete from the shared tier and drop the key from every local tier."""
+        local_key = self.make_and_validate_key(key, version=version)
+        deleted = self.shared.delete(key, version=version)
+        self._invalidate([local_key])
+        return deleted
+
+    def delete_many(self, keys: Iterable[Any], version: int | None = None) -> None:
+        """Delete from the shared tier and drop the keys from every local tier."""
+        keys = list(keys)
+        local_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        self.shared.delete_many(keys, version=version)
+        self._invalidate(local_keys)
+
+    def clear(self) -> None:
+        """Clear the shared tier and every local tier."""
+        self.shared.clear()
+        self._local.clear()
+        self._local.generation = self._seed_generation()
+        self._local.checked_at = time.monotonic()
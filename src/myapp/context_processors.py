@@ -1,8 +1,21 @@
 from django.contrib.sites.models import Site
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject, lazy
+
+from .site_configuration import get_site_configuration
+
+
+def _current_site_name() -> str:
+    # get_current() is served from django.contrib.sites' per-process SITE_CACHE,
+    # which is cleared when a Site is saved or deleted
+    return Site.objects.get_current().name
 
 
 def site_name(request: HttpRequest) -> dict:  # noqa: ARG001
-    """Add the site name to the context."""
-    current_site = Site.objects.get_current()
-    return {"site_name": current_site.name}
+    """Add the site name to the context, resolved only if a template uses it."""
+    return {"site_name": lazy(_current_site_name, str)()}
+
+
+def site_config(request: HttpRequest) -> dict:  # noqa: ARG001
+    """Add the site configuration snapshot to the context, loaded only if a template uses it."""
+    return {"site_config": SimpleLazyObject(get_site_configuration)}
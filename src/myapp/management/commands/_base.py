@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import signal
 import time
-import traceback
+from typing import TYPE_CHECKING
 
+from asgiref.sync import sync_to_async
+from django.apps import apps
 from django.core.management import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 
-from myapp.models import WorkerConfiguration, WorkerError
+from myapp.models import CircuitBreaker, WorkerConfiguration
+from myapp.notifications import Listener, channel_name, notifications_supported
+
+from ._errors import ErrorRecorder
+from ._metrics import RunMetrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from multiprocessing import Queue
+
+    from django.db.models import Model, QuerySet
 
 LOG_LEVELS = {
     logging.DEBUG: "DEBUG",
@@ -24,8 +39,33 @@ def get_log_level_name(log_level_number: int) -> str:
     return LOG_LEVELS.get(log_level_number, "UNKNOWN")
 
 
-class BaseWorkerCommand(BaseCommand):
-    """Base worker command. This should be subclassed."""
+# rows claimed per transaction, override with config.custom["claim_batch_size"]
+DEFAULT_CLAIM_BATCH_SIZE = 100
+
+# seconds between heartbeat writes, override with config.custom["heartbeat_seconds"]
+DEFAULT_HEARTBEAT_SECONDS = 30
+
+# tasks an async worker runs at once, override with config.custom["concurrency"]
+DEFAULT_CONCURRENCY = 10
+
+# seconds an async worker waits for in-flight tasks on shutdown before cancelling
+# them, override with config.custom["drain_seconds"]
+DEFAULT_DRAIN_SECONDS = 30
+
+# seconds a claim transaction may sit idle before PostgreSQL ends it and releases
+# the claimed rows, override with config.custom["claim_lease_seconds"]
+DEFAULT_CLAIM_LEASE_SECONDS = 300
+
+# WorkerError writes per minute; further errors are counted in memory and written
+# later, override with config.custom["error_writes_per_minute"]
+DEFAULT_ERROR_WRITES_PER_MINUTE = 10
+
+
+class _WorkerCommand(BaseCommand):
+    """What the sync and async worker commands share: configuration, logging, errors, backoff and metrics.
+
+    Subclass ``BaseWorkerCommand`` or ``AsyncBaseWorkerCommand``.
+    """
 
     abstract = True
 
@@ -33,6 +73,10 @@ class BaseWorkerCommand(BaseCommand):
 
     NAME = "UPDATE ME"
 
+    # set in the children of a --processes supervisor, see _supervisor.py
+    metrics_queue: Queue | None = None
+    metrics_slot = 0
+
     def __init__(self, *args, **kwargs) -> None:  # noqa: ANN003, ANN002
         """Initialize the worker."""
         super().__init__(*args, **kwargs)
@@ -53,6 +97,14 @@ class BaseWorkerCommand(BaseCommand):
         self.current_log_level = self.logger.getEffectiveLevel()
         self.keep_running = True
 
+        # current idle backoff in seconds, None while the worker is finding work
+        self.idle_sleep_seconds: int | None = None
+
+        self.run_metrics = RunMetrics()
+        self._last_heartbeat: float | None = None
+        self.errors = ErrorRecorder()
+        self._circuit_breakers: dict[str, CircuitBreaker] = {}
+
     def _update_log_level(self) -> None:
         """Update the log level if it has changed."""
         self.current_log_level = self.logger.getEffectiveLevel()
@@ -65,52 +117,410 @@ class BaseWorkerCommand(BaseCommand):
                 get_log_level_name(self.config.log_level),
             )
 
+    def _error_write_limit(self) -> int:
+        return int((self.config.custom or {}).get("error_writes_per_minute", DEFAULT_ERROR_WRITES_PER_MINUTE))
+
     def _log_crawl_error(self, the_exception: Exception | None = None) -> None:
-        """Log a crawl error."""
+        """Log a crawl error and count it on its WorkerError, see ``ErrorRecorder``."""
         self.logger.error("Crawl Error: %s", the_exception)
-        error = f"{the_exception!s}\n\n{traceback.format_exc()}"
+        self.errors.record(self.config, the_exception, self._error_write_limit())
 
-        WorkerError.objects.create(
-            error=error,
-            worker=self.config,
-        )
+    def circuit_breaker(self, name: str) -> CircuitBreaker:
+        """Return the circuit breaker of the dependency ``name``, shared with every worker using it.
+
+        Ask ``allow()`` before calling the dependency and report the outcome
+        with ``record_success()`` or ``record_failure()``, on a path that
+        commits. While the breaker is open, return 0 from ``run()`` so the
+        loop backs off.
+        """
+        if name not in self._circuit_breakers:
+            self._circuit_breakers[name], _ = CircuitBreaker.objects.get_or_create(name=name)
+        return self._circuit_breakers[name]
 
     @property
     def logger(self) -> logging.Logger:
         return logging.getLogger(f"{self.__class__.__name__}.{self.NAME}")
 
-    def run(self) -> None:
-        """Run the worker."""
-        msg = "Please implement the run method."
-        raise NotImplementedError(msg)
+    def _replace_broken_connection(self) -> None:
+        """Close the connection if a failed query left it unusable, e.g. after a claim lease ran out.
+
+        The next query opens a new one. A healthy connection is kept across
+        runs, so an idle worker does not reconnect on every loop and keeps
+        the LISTEN registered on it.
+        """
+        if connection.connection is None or not connection.errors_occurred:
+            return
+        if connection.is_usable():
+            connection.errors_occurred = False
+        else:
+            connection.close()
+
+    def _refresh_config(self) -> None:
+        """Reload the configuration, but only if its version has changed since the last load."""
+        version = WorkerConfiguration.objects.filter(pk=self.config.pk).values_list("version", flat=True).first()
+        if version != self.config.version:
+            self.config.refresh_from_db()
+
+    def _next_sleep(self, work: int | None) -> int:
+        """Return how long to sleep after a run that processed ``work`` items.
+
+        Busy runs are followed by the next run immediately. Idle runs back off
+        exponentially from ``sleep_seconds`` (at least one second, so an idle
+        worker never spins) up to ``max_sleep_seconds``.
+        """
+        if work is None:
+            self.idle_sleep_seconds = None
+            return self.config.sleep_seconds
+
+        if work > 0:
+            self.idle_sleep_seconds = None
+            return 0
+
+        min_idle_sleep = max(1, self.config.sleep_seconds)
+        if self.idle_sleep_seconds is None:
+            self.idle_sleep_seconds = min_idle_sleep
+        else:
+            self.idle_sleep_seconds *= 2
+        self.idle_sleep_seconds = min(self.idle_sleep_seconds, max(self.config.max_sleep_seconds, min_idle_sleep))
+        return self.idle_sleep_seconds
 
     def signal_handler(self, the_signal: int, frame) -> None:  # noqa: ANN001, ARG002
         self.logger.critical("Received %d. Stopping the worker.", the_signal)
         self.keep_running = False
 
+    def add_arguments(self, parser) -> None:  # noqa: ANN001
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Run this many worker processes under a supervisor, e.g. for CPU-bound jobs.",
+        )
+
+    def _record_run(self, work: int | None, seconds: float) -> None:
+        """Add a run to the rolling metrics, and report it to the supervisor if there is one."""
+        self.run_metrics.record(work or 0, seconds)
+        if self.metrics_queue is not None:
+            self.metrics_queue.put((self.metrics_slot, work or 0, seconds))
+
+    def _heartbeat(self) -> None:
+        """Write the heartbeat, rolling run metrics and held errors, at most every ``heartbeat_seconds``.
+
+        This is a single-row UPDATE of the configuration; under ``--processes``
+        each child writes its own figures, so the row shows the latest writer.
+        """
+        now = time.monotonic()
+        interval = int((self.config.custom or {}).get("heartbeat_seconds", DEFAULT_HEARTBEAT_SECONDS))
+        if self._last_heartbeat is not None and now - self._last_heartbeat < interval:
+            return
+
+        self._last_heartbeat = now
+        self.errors.flush(self.config, self._error_write_limit())
+        WorkerConfiguration.objects.filter(pk=self.config.pk).update(
+            last_heartbeat_at=timezone.now(),
+            **self.run_metrics.fields(),
+        )
+
     def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        processes = options.get("processes", 1)
+        if processes > 1:
+            from ._supervisor import Supervisor  # noqa: PLC0415
+
+            Supervisor(self, processes).run()
+        else:
+            self.run_worker()
+
+    def run_worker(self) -> None:
+        """Run the worker loop in this process until stopped."""
+        msg = "Subclass BaseWorkerCommand or AsyncBaseWorkerCommand."
+        raise NotImplementedError(msg)
+
+
+class BaseWorkerCommand(_WorkerCommand):
+    """Base worker command. This should be subclassed."""
+
+    abstract = True
+
+    # wrap each run() in one transaction; workers that claim rows with
+    # claim_batches() turn this off so every batch commits on its own
+    ATOMIC_RUN = True
+
+    # labels of models ("app_label.Model") whose saves wake the worker early; the
+    # models must be registered with myapp.notifications.notify_on_save. Saving
+    # the worker's configuration always wakes it.
+    WAKE_ON: tuple[str, ...] = ()
+
+    def run(self) -> int | None:
+        """Run the worker.
+
+        Return the number of items processed to let the loop adapt its sleep
+        (see ``_next_sleep``), or None to sleep ``sleep_seconds`` every time.
+        """
+        msg = "Please implement the run method."
+        raise NotImplementedError(msg)
+
+    def _run_once(self) -> int | None:
+        """Run the worker once; an exception is recorded as a worker error and counts as an idle run."""
+        try:
+            if self.ATOMIC_RUN:
+                with transaction.atomic():
+                    return self.run()
+            return self.run()
+        except Exception as e:  # noqa: BLE001
+            # the run's transaction has rolled back, so the error is kept
+            self._log_crawl_error(e)
+            return 0
+
+    def _set_claim_lease(self) -> None:
+        """Bound how long a stalled worker can hold its claimed rows (PostgreSQL only).
+
+        If the worker dies, its connection drops and the locks go with it. If it
+        hangs with the transaction open, the server ends the session after the
+        lease. Time spent processing between queries counts against the lease,
+        so it must be longer than the worst case of a batch, e.g. of sending
+        a batch of emails to a slow SMTP server. A batch whose session was
+        ended is rolled back, including the marks of work it already did
+        outside the database, and is claimed again; the loop replaces the
+        dead connection before the next run (see ``_replace_broken_connection``).
+        """
+        if connection.vendor != "postgresql":
+            return
+
+        lease = int((self.config.custom or {}).get("claim_lease_seconds", DEFAULT_CLAIM_LEASE_SECONDS))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL idle_in_transaction_session_timeout = '{lease}s'")
+
+    def claim_batches(
+        self,
+        queryset: QuerySet,
+        handler: Callable[[list[Model]], bool | None],
+        batch_size: int | None = None,
+    ) -> int:
+        """Claim rows in batches and pass each batch to ``handler``.
+
+        Each batch is selected with ``SELECT ... FOR UPDATE SKIP LOCKED`` and
+        handled in its own transaction, so replicas of a worker share the
+        queue without processing a row twice. The handler must change the rows
+        so they leave ``queryset``; a handler that raises rolls back its batch
+        only. Claiming stops when the queue is empty, the worker is stopping,
+        or the handler returns False. On backends without row locks (SQLite)
+        this degrades to plain batched processing.
+
+        Returns the number of rows claimed.
+        """
+        if batch_size is None:
+            batch_size = int((self.config.custom or {}).get("claim_batch_size", DEFAULT_CLAIM_BATCH_SIZE))
+
+        claimed = 0
+        while self.keep_running:
+            with transaction.atomic():
+                self._set_claim_lease()
+                # lock only the claimed rows, not rows joined in by select_related
+                batch = list(queryset.select_for_update(skip_locked=True, of=("self",))[:batch_size])
+                if not batch:
+                    break
+
+                claimed += len(batch)
+                if handler(batch) is False:
+                    break
+
+        return claimed
+
+    def _build_listener(self) -> Listener | None:
+        """Return a listener for configuration changes and the WAKE_ON models, or None to poll."""
+        if not notifications_supported():
+            return None
+        models: list[type[Model]] = [WorkerConfiguration, *(apps.get_model(label) for label in self.WAKE_ON)]
+        return Listener(channel_name(model) for model in models)
+
+    def _sleep(self, seconds: int, listener: Listener | None) -> None:
+        """Sleep between runs, returning early when stopping or notified."""
+        for _ in range(seconds):
+            if not self.keep_running:
+                break
+            if listener is None:
+                time.sleep(1)
+            elif listener.wait(1):
+                self.logger.debug("Woken up by a notification.")
+                break
+
+    def run_worker(self) -> None:
+        """Run the worker loop in this process until stopped."""
         self.logger.info("Starting worker...")
 
         # Set up the signal handler to handle SIGINT and SIGTERM
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
 
+        listener = self._build_listener()
+
         while self.keep_running:
-            self.config.refresh_from_db()
+            self._replace_broken_connection()
+            if listener is not None:
+                # before run(), so notifications sent while it works wake the next sleep
+                listener.listen()
+            self._refresh_config()
             self._update_log_level()
 
-            if self.config.is_enabled:
-                with transaction.atomic():
-                    self.run()
-            else:
+            work = None
+            if not self.config.is_enabled:
                 self.logger.debug("Job is disabled.")
+            else:
+                started = time.monotonic()
+                work = self._run_once()
+                self._record_run(work, time.monotonic() - started)
 
-            self.logger.debug(
-                "Sleeping for %d seconds.",
-                self.config.sleep_seconds,
-            )
+            self._heartbeat()
 
-            for _ in range(self.config.sleep_seconds):
-                if not self.keep_running:
-                    break
-                time.sleep(1)
+            sleep_seconds = self._next_sleep(work)
+            self.logger.debug("Sleeping for %d seconds.", sleep_seconds)
+            self._sleep(sleep_seconds, listener)
+
+
+class AsyncBaseWorkerCommand(_WorkerCommand):
+    """Base worker command whose run() is a coroutine. This should be subclassed.
+
+    ``run()`` hands work to ``await spawn()``, which runs it as a task with at
+    most ``config.custom["concurrency"]`` tasks in flight. A run ends, and is
+    timed, when its tasks have finished. On SIGINT or SIGTERM the loop stops
+    and in-flight tasks get ``config.custom["drain_seconds"]`` to finish
+    before they are cancelled.
+
+    The ORM is synchronous: wrap database work in ``sync_to_async``, and keep
+    transactions inside the wrapped function. There is no WAKE_ON, the loop
+    polls.
+    """
+
+    abstract = True
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN003, ANN002
+        """Initialize the worker."""
+        super().__init__(*args, **kwargs)
+        self._tasks: set[asyncio.Task] = set()
+        self._concurrency = 0
+        self._semaphore = self._new_semaphore()
+        # replaced by ahandle(), so the loop that runs the worker owns it
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> int | None:
+        """Run the worker once.
+
+        Return the number of records handled, or ``None`` if unknown; ``0``
+        means the worker was idle and the loop backs off before the next run.
+        """
+        msg = "Please implement the run method."
+        raise NotImplementedError(msg)
+
+    def _custom(self, key: str, default: int) -> int:
+        return int((self.config.custom or {}).get(key, default))
+
+    def _new_semaphore(self) -> asyncio.Semaphore:
+        self._concurrency = self._custom("concurrency", DEFAULT_CONCURRENCY)
+        return asyncio.Semaphore(self._concurrency)
+
+    def _update_concurrency(self) -> None:
+        """Size the semaphore from the configuration; tasks already queued keep the old one."""
+        if self._custom("concurrency", DEFAULT_CONCURRENCY) != self._concurrency:
+            self._semaphore = self._new_semaphore()
+
+    async def spawn(self, coro: Coroutine) -> asyncio.Task:
+        """Run ``coro`` as a task, waiting first for a free slot within the concurrency limit.
+
+        So ``run()`` is held back while the limit is reached, and never has
+        more than ``concurrency`` tasks in flight. A task that raises is
+        logged as a worker error; it does not stop the worker.
+        """
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            task = asyncio.create_task(self._run_task(coro, semaphore))
+        except BaseException:
+            semaphore.release()
+            raise
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_task(self, coro: Coroutine, semaphore: asyncio.Semaphore) -> None:
+        """Await ``coro`` and release the slot that ``spawn()`` took for it."""
+        try:
+            await coro
+        except Exception as e:  # noqa: BLE001
+            await sync_to_async(self._log_crawl_error)(e)
+        finally:
+            semaphore.release()
+
+    async def _finish_tasks(self) -> None:
+        """Wait for the tasks in flight, so the next run does not hand out their work again.
+
+        Returns early when the worker is stopping; ``drain()`` then takes over.
+        """
+        if not self._tasks:
+            return
+        finished: asyncio.Future = asyncio.gather(*self._tasks, return_exceptions=True)
+        stopping: asyncio.Future = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({finished, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+    async def drain(self) -> None:
+        """Wait for in-flight tasks, cancelling those still running after ``drain_seconds``."""
+        if not self._tasks:
+            return
+
+        self.logger.info("Waiting for %d tasks to finish.", len(self._tasks))
+        _, pending = await asyncio.wait(self._tasks, timeout=self._custom("drain_seconds", DEFAULT_DRAIN_SECONDS))
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.logger.warning("Cancelled %d tasks that did not finish in time.", len(pending))
+            await asyncio.wait(pending)
+
+    def signal_handler(self, the_signal: int, frame) -> None:  # noqa: ANN001
+        super().signal_handler(the_signal, frame)
+        self._stopping.set()
+
+    def _add_signal_handlers(self, loop: asyncio.AbstractEventLoop) -> None:
+        for the_signal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(the_signal, self.signal_handler, the_signal, None)
+
+    async def _asleep(self, seconds: int) -> None:
+        """Sleep between runs, returning as soon as the worker is stopping."""
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+
+    async def ahandle(self) -> None:
+        """Run the worker loop on the current event loop."""
+        self.logger.info("Starting worker...")
+        self._stopping = asyncio.Event()
+        self._add_signal_handlers(asyncio.get_running_loop())
+
+        try:
+            while self.keep_running:
+                await sync_to_async(self._replace_broken_connection)()
+                await sync_to_async(self._refresh_config)()
+                self._update_log_level()
+                self._update_concurrency()
+
+                work = None
+                if not self.config.is_enabled:
+                    self.logger.debug("Job is disabled.")
+                else:
+                    started = time.monotonic()
+                    try:
+                        work = await self.run()
+                    except Exception as e:  # noqa: BLE001
+                        await sync_to_async(self._log_crawl_error)(e)
+                        work = 0
+                    await self._finish_tasks()
+                    self._record_run(work, time.monotonic() - started)
+
+                await sync_to_async(self._heartbeat)()
+
+                sleep_seconds = self._next_sleep(work)
+                self.logger.debug("Sleeping for %d seconds.", sleep_seconds)
+                await self._asleep(sleep_seconds)
+        finally:
+            await self.drain()
+
+    def run_worker(self) -> None:
+        """Run the worker loop on a new event loop until stopped."""
+        asyncio.run(self.ahandle())
@@ -0,0 +1,67 @@
+"""Deduplicated, rate-limited recording of worker errors as WorkerError rows."""
+
+from __future__ import annotations
+
+import time
+import traceback
+from collections import deque
+from typing import TYPE_CHECKING
+
+from myapp.models import WorkerError
+from myapp.models.worker_errors import error_fingerprint
+
+if TYPE_CHECKING:
+    from myapp.models import WorkerConfiguration
+
+# window of the per-worker write limit, in seconds
+ERROR_WINDOW_SECONDS = 60
+
+
+class ErrorRecorder:
+    """Record a worker's errors, writing at most ``limit`` times per minute.
+
+    Every occurrence is counted. Writes beyond the limit are held in memory,
+    merged by fingerprint, and written by ``flush()`` once the window allows,
+    so a worker failing in a tight loop costs a few writes a minute and one
+    row per distinct failure.
+    """
+
+    def __init__(self) -> None:
+        """Start with nothing pending."""
+        # fingerprint -> [occurrences, text of the first one]
+        self.pending: dict[str, list] = {}
+        # monotonic times of the writes in the current window
+        self.writes: deque[float] = deque()
+
+    def _allowed(self, limit: int) -> bool:
+        """Return True and count a write if the window has room for one."""
+        now = time.monotonic()
+        while self.writes and now - self.writes[0] >= ERROR_WINDOW_SECONDS:
+            self.writes.popleft()
+        if len(self.writes) >= limit:
+            return False
+        self.writes.append(now)
+        return True
+
+    def record(self, worker: WorkerConfiguration, exception: BaseException | None, limit: int) -> None:
+        """Record one occurrence of ``exception``, or of the exception being handled if None."""
+        # format the exception itself, so this also works outside of an except block
+        trace = "".join(traceback.format_exception(exception)) if exception else traceback.format_exc()
+        error = f"{exception!s}\n\n{trace}"
+        fingerprint = error_fingerprint(exception, error)
+
+        held = self.pending.setdefault(fingerprint, [0, error])
+        held[0] += 1
+        if self._allowed(limit):
+            self._write(worker, fingerprint)
+
+    def flush(self, worker: WorkerConfiguration, limit: int) -> None:
+        """Write held occurrences while the window has room."""
+        for fingerprint in list(self.pending):
+            if not self._allowed(limit):
+                break
+            self._write(worker, fingerprint)
+
+    def _write(self, worker: WorkerConfiguration, fingerprint: str) -> None:
+        occurrences, error = self.pending.pop(fingerprint)
+        WorkerError.record(worker, fingerprint, error, occurrences)
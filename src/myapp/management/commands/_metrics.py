@@ -0,0 +1,50 @@
+"""Rolling run metrics of a worker, persisted on its WorkerConfiguration."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+
+# runs kept for the rolling throughput and latency figures
+METRICS_WINDOW = 100
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """Duration and item count of the most recent runs."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Keep the last ``window`` runs."""
+        # (finished at, seconds, items), finished at on the monotonic clock
+        self.runs: deque[tuple[float, float, int]] = deque(maxlen=window)
+
+    def record(self, items: int, seconds: float) -> None:
+        """Add a run that processed ``items`` in ``seconds``."""
+        self.runs.append((time.monotonic(), seconds, items))
+
+    def fields(self) -> dict[str, float]:
+        """Return the WorkerConfiguration metrics fields for the runs in the window.
+
+        Throughput is measured over wall time, from the start of the oldest
+        run to the end of the newest, so time spent sleeping counts.
+        """
+        if not self.runs:
+            return {}
+
+        durations = sorted(seconds for _, seconds, _ in self.runs)
+        oldest_finished, oldest_seconds, _ = self.runs[0]
+        span = self.runs[-1][0] - (oldest_finished - oldest_seconds)
+        items = sum(items for _, _, items in self.runs)
+
+        return {
+            "last_run_duration": self.runs[-1][1],
+            "items_per_second": items / span if span > 0 else 0.0,
+            "run_latency_p50": _percentile(durations, 50),
+            "run_latency_p95": _percentile(durations, 95),
+        }
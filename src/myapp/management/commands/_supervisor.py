@@ -0,0 +1,194 @@
+"""Run a worker command as N forked processes under a supervisor (``--processes N``).
+
+The supervisor does no work itself. It forks the children, restarts any that
+crash, forwards SIGINT/SIGTERM to them, and aggregates the per-run metrics
+they report over a queue. Every child runs the normal worker loop against the
+same ``WorkerConfiguration``, so jobs that share a queue should claim their
+rows with ``claim_batches``.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import signal
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from django.db import connections
+
+if TYPE_CHECKING:
+    import logging
+    from multiprocessing.process import BaseProcess
+
+    from ._base import _WorkerCommand
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+# seconds between checks on the children
+POLL_INTERVAL = 1.0
+
+# seconds to wait before restarting a child that died, so a crash loop cannot spin
+RESTART_DELAY = 1.0
+
+# seconds between metrics summaries in the log
+METRICS_INTERVAL = 60.0
+
+# seconds the children get to finish after SIGTERM before they are killed
+SHUTDOWN_TIMEOUT = 30.0
+
+
+@dataclass
+class ChildMetrics:
+    """Counters for one child slot, summed over its restarts."""
+
+    runs: int = 0
+    items: int = 0
+    seconds: float = 0.0
+    restarts: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        """Return the throughput of the slot while running."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+def _child_main(command: _WorkerCommand, slot: int, metrics_queue: multiprocessing.Queue) -> None:
+    """Run the worker loop in a forked child."""
+    # the supervisor's handlers were inherited across fork; the worker loop installs its own
+    for the_signal in STOP_SIGNALS:
+        signal.signal(the_signal, signal.SIG_DFL)
+
+    command.metrics_queue = metrics_queue
+    command.metrics_slot = slot
+    command.keep_running = True
+    try:
+        command.run_worker()
+    finally:
+        connections.close_all()
+
+
+class Supervisor:
+    """Fork, watch and stop the worker processes of one command."""
+
+    poll_interval = POLL_INTERVAL
+    restart_delay = RESTART_DELAY
+    metrics_interval = METRICS_INTERVAL
+    shutdown_timeout = SHUTDOWN_TIMEOUT
+
+    def __init__(self, command: _WorkerCommand, processes: int) -> None:
+        """Prepare to run ``processes`` children of ``command``."""
+        self.command = command
+        self.processes = processes
+
+        self.context = multiprocessing.get_context("fork")
+        self.metrics_queue = self.context.Queue()
+        self.children: dict[int, BaseProcess] = {}
+        self.started_at: dict[int, float] = {}
+        self.metrics = {slot: ChildMetrics() for slot in range(processes)}
+        self.stopping = False
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self.command.logger
+
+    def stop(self, the_signal: int | None = None, frame=None) -> None:  # noqa: ANN001, ARG002
+        """Stop restarting children and shut them down."""
+        if the_signal is not None:
+            self.logger.critical("Received %d. Stopping the worker processes.", the_signal)
+        self.stopping = True
+
+    def _start_child(self, slot: int) -> None:
+        # a forked child must not share the parent's database sockets
+        connections.close_all()
+        process = self.context.Process(
+            target=_child_main,
+            args=(self.command, slot, self.metrics_queue),
+            name=f"{self.command.NAME}-{slot}",
+        )
+        process.start()
+        self.children[slot] = process
+        self.started_at[slot] = time.monotonic()
+        self.logger.info("Started worker process %d (pid %d).", slot, process.pid)
+
+    def _restart_dead_children(self) -> None:
+        for slot, process in self.children.items():
+            if process.is_alive() or self.stopping:
+                continue
+            if time.monotonic() - self.started_at[slot] < self.restart_delay:
+                continue
+
+            process.join()
+            self.logger.error(
+                "Worker process %d (pid %d) exited with code %s, restarting.", slot, process.pid, process.exitcode
+            )
+            self.metrics[slot].restarts += 1
+            self._start_child(slot)
+
+    def _collect_metrics(self, timeout: float) -> None:
+        """Fold the runs reported by the children into ``metrics``, waiting up to ``timeout`` for the first."""
+        try:
+            record = self.metrics_queue.get(timeout=timeout) if timeout > 0 else self.metrics_queue.get_nowait()
+            while True:
+                slot, items, seconds = record
+                metrics = self.metrics[slot]
+                metrics.runs += 1
+                metrics.items += items
+                metrics.seconds += seconds
+                record = self.metrics_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def report(self) -> None:
+        """Log the aggregated metrics of all children."""
+        for slot, metrics in self.metrics.items():
+            self.logger.info(
+                "Worker process %d: %d runs, %d items, %.1f items/s, %d restarts.",
+                slot,
+                metrics.runs,
+                metrics.items,
+                metrics.items_per_second,
+                metrics.restarts,
+            )
+        items = sum(metrics.items for metrics in self.metrics.values())
+        self.logger.info("All %d worker processes: %d items.", self.processes, items)
+
+    def _shutdown(self) -> None:
+        """Forward SIGTERM to the children, then kill those still running after the timeout."""
+        for process in self.children.values():
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for slot, process in self.children.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                self.logger.warning("Worker process %d (pid %d) did not stop, killing it.", slot, process.pid)
+                process.kill()
+                process.join()
+
+        self._collect_metrics(timeout=0)
+
+    def run(self) -> None:
+        """Supervise the children until SIGINT or SIGTERM."""
+        self.command._update_log_level()  # noqa: SLF001
+        self.logger.info("Starting %d worker processes...", self.processes)
+        previous_handlers = {the_signal: signal.signal(the_signal, self.stop) for the_signal in STOP_SIGNALS}
+
+        for slot in range(self.processes):
+            self._start_child(slot)
+
+        last_report = time.monotonic()
+        try:
+            while not self.stopping:
+                self._collect_metrics(self.poll_interval)
+                self._restart_dead_children()
+                if time.monotonic() - last_report >= self.metrics_interval:
+                    self.report()
+                    last_report = time.monotonic()
+        finally:
+            self._shutdown()
+            self.report()
+            for the_signal, handler in previous_handlers.items():
+                signal.signal(the_signal, handler)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.apps import apps
+from django.utils import timezone
+
+from ._base import BaseWorkerCommand
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.db.models import Model
+
+# rows deleted per transaction, override with config.custom["prune_batch_size"]
+DEFAULT_PRUNE_BATCH_SIZE = 1000
+
+
+class Command(BaseWorkerCommand):
+    """Delete log rows older than their retention, in small batches."""
+
+    help = "Delete expired worker errors and invitation logs"
+    NAME = "prune_records"
+
+    # every batch commits on its own, so locks are short and progress is kept
+    ATOMIC_RUN = False
+
+    # (model label, indexed timestamp field, default retention in days); override
+    # the retention with config.custom["retention_days"][label], 0 keeps forever
+    PRUNE = (
+        ("myapp.WorkerError", "last_seen_at", 90),
+        ("organizations.InvitationLog", "created_at", 365),
+    )
+
+    def run(self) -> int:
+        """Prune every table; return the number of rows deleted."""
+        custom = self.config.custom or {}
+        retention = custom.get("retention_days", {})
+        batch_size = int(custom.get("prune_batch_size", DEFAULT_PRUNE_BATCH_SIZE))
+
+        deleted = 0
+        for label, field, default_days in self.PRUNE:
+            days = int(retention.get(label, default_days))
+            if days > 0:
+                deleted += self.prune(apps.get_model(label), field, timezone.now() - timedelta(days=days), batch_size)
+        return deleted
+
+    def prune(self, model: type[Model], field: str, cutoff: datetime, batch_size: int) -> int:
+        """Delete the rows of ``model`` whose ``field`` is before ``cutoff``, oldest first.
+
+        Each batch is a range scan on the index of ``field`` starting at the
+        previous batch's newest timestamp, so it does not wade through the
+        index entries of rows already deleted (PostgreSQL keeps them until
+        vacuum). Returns the number of rows deleted.
+        """
+        expired = model._default_manager.filter(**{f"{field}__lt": cutoff}).order_by(field)  # noqa: SLF001
+        cursor = None
+        deleted = 0
+        while self.keep_running:
+            batch = expired if cursor is None else expired.filter(**{f"{field}__gte": cursor})
+            rows = list(batch.values_list("pk", field)[:batch_size])
+            if not rows:
+                break
+
+            # a single DELETE, committed on its own
+            count, _ = model._default_manager.filter(pk__in=[pk for pk, _ in rows]).delete()  # noqa: SLF001
+            deleted += count
+            cursor = rows[-1][1]
+
+        if deleted:
+            self.logger.info("Deleted %d %s rows older than %s.", deleted, model._meta.label, cutoff)  # noqa: SLF001
+        return deleted
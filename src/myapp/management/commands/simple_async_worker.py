@@ -1,12 +1,22 @@
-from ._base import BaseWorkerCommand
+import asyncio
 
+from ._base import AsyncBaseWorkerCommand
 
-class Command(BaseWorkerCommand):
+
+class Command(AsyncBaseWorkerCommand):
     """Simple Async Worker."""
 
     help = "Simple Async Worker"
     NAME = "simple_async_worker"
 
-    def run(self) -> None:
+    async def run(self) -> None:
         """Run the worker."""
         self.logger.debug("I'm here, running things...")
+
+        for job in range(3):
+            await self.spawn(self.do_job(job))
+
+    async def do_job(self, job: int) -> None:
+        """Do one unit of I/O-bound work, e.g. call a webhook."""
+        await asyncio.sleep(1)
+        self.logger.debug("Finished job %d.", job)
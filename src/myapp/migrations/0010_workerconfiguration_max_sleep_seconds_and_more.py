@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_remove_required_2fa_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='max_sleep_seconds',
+            field=models.IntegerField(default=60, help_text='Longest sleep between runs while the worker finds no work.'),
+        ),
+        migrations.AlterField(
+            model_name='workerconfiguration',
+            name='sleep_seconds',
+            field=models.IntegerField(default=10, help_text='Seconds to sleep between runs; the starting point of the idle backoff.'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_workerconfiguration_max_sleep_seconds_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='items_per_second',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='last_heartbeat_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='last_run_duration',
+            field=models.FloatField(blank=True, editable=False, help_text='Seconds.', null=True),
+        ),
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='run_latency_p50',
+            field=models.FloatField(blank=True, editable=False, help_text='Seconds.', null=True),
+        ),
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='run_latency_p95',
+            field=models.FloatField(blank=True, editable=False, help_text='Seconds.', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_workerconfiguration_items_per_second_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='workerconfiguration',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:15
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_last_seen_at(apps, schema_editor):
+    WorkerError = apps.get_model('myapp', 'WorkerError')
+    WorkerError.objects.update(last_seen_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_workerconfiguration_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workererror',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='workererror',
+            name='last_seen_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(set_last_seen_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='workererror',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='workererror',
+            constraint=models.UniqueConstraint(condition=models.Q(('error_status', 'O')), fields=('worker', 'fingerprint'), name='myapp_workererror_one_open_per_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_workererror_fingerprint_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workererror',
+            index=models.Index(fields=['worker', 'created_at'], name='myapp_worke_worker__ee5637_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workererror',
+            index=models.Index(fields=['last_seen_at'], name='myapp_worke_last_se_209120_idx'),
+        ),
+    ]
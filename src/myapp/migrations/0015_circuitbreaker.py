@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:20
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_workererror_myapp_worke_worker__ee5637_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CircuitBreaker',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='The dependency, e.g. smtp.', max_length=255, unique=True)),
+                ('state', models.CharField(choices=[('C', 'Closed'), ('O', 'Open'), ('H', 'Half-open')], default='C', max_length=1)),
+                ('failure_threshold', models.PositiveIntegerField(default=5, help_text='Consecutive failures that open the breaker.')),
+                ('open_seconds', models.PositiveIntegerField(default=60, help_text='Seconds to refuse calls before probing.')),
+                ('failures', models.PositiveIntegerField(default=0, editable=False, help_text='Consecutive failures.')),
+                ('opened_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('last_failure_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('last_error', models.TextField(blank=True, default='', editable=False)),
+            ],
+        ),
+    ]
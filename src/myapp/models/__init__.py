@@ -3,6 +3,7 @@
 import solo.models
 from django.db import models
 
+from .circuit_breakers import CircuitBreaker
 from .worker_configurations import WorkerConfiguration
 from .worker_errors import WorkerError
 
@@ -42,4 +43,4 @@ class SiteConfiguration(solo.models.SingletonModel):
         return "Site Configuration"
 
 
-__all__ = ["SiteConfiguration", "WorkerConfiguration", "WorkerError"]
+__all__ = ["CircuitBreaker", "SiteConfiguration", "WorkerConfiguration", "WorkerError"]
@@ -0,0 +1,86 @@
+import uuid
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class CircuitBreaker(models.Model):
+    """Stop calling an external dependency while it keeps failing.
+
+    Shared by every worker process that uses the dependency. After
+    ``failure_threshold`` consecutive failures the breaker opens and calls
+    are refused for ``open_seconds``. Then one caller is let through as a
+    probe (half-open): its success closes the breaker, its failure opens it
+    again. State changes are written in the caller's transaction.
+    """
+
+    STATE_CLOSED = "C"
+    STATE_OPEN = "O"
+    STATE_HALF_OPEN = "H"
+    STATE_CHOICES = ((STATE_CLOSED, "Closed"), (STATE_OPEN, "Open"), (STATE_HALF_OPEN, "Half-open"))
+
+    uuid = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
+    name = models.CharField(max_length=255, unique=True, help_text="The dependency, e.g. smtp.")
+    state = models.CharField(max_length=1, choices=STATE_CHOICES, default=STATE_CLOSED)
+
+    failure_threshold = models.PositiveIntegerField(default=5, help_text="Consecutive failures that open the breaker.")
+    open_seconds = models.PositiveIntegerField(default=60, help_text="Seconds to refuse calls before probing.")
+
+    failures = models.PositiveIntegerField(default=0, editable=False, help_text="Consecutive failures.")
+    opened_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_failure_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_error = models.TextField(blank=True, default="", editable=False)
+
+    def __str__(self) -> str:
+        """Return the dependency name."""
+        return self.name
+
+    def save(self, *args, **kwargs) -> None:  # noqa: ANN003, ANN002
+        """Start counting afresh when the breaker is closed, e.g. by hand in the admin."""
+        if self.state == self.STATE_CLOSED:
+            self.failures, self.opened_at = 0, None
+        super().save(*args, **kwargs)
+
+    def allow(self) -> bool:
+        """Return True if a call may go through now.
+
+        Reads the shared state first. Once the open interval is over, only
+        one caller wins the switch to half-open and probes; a probe that never
+        reports back is replaced after another interval.
+        """
+        self.refresh_from_db()
+        if self.state == self.STATE_CLOSED:
+            return True
+
+        now = timezone.now()
+        if self.opened_at is not None and now - self.opened_at < timedelta(seconds=self.open_seconds):
+            return False
+
+        probing = type(self).objects.filter(pk=self.pk, state=self.state, opened_at=self.opened_at)
+        if not probing.update(state=self.STATE_HALF_OPEN, opened_at=now):
+            return False
+        self.state, self.opened_at = self.STATE_HALF_OPEN, now
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        if self.state == self.STATE_CLOSED and not self.failures:
+            return
+        type(self).objects.filter(pk=self.pk).update(state=self.STATE_CLOSED, failures=0, opened_at=None)
+        self.state, self.failures, self.opened_at = self.STATE_CLOSED, 0, None
+
+    def record_failure(self, error: Exception | str) -> None:
+        """Count a failed call, opening the breaker at the threshold or after a failed probe."""
+        now = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(
+            failures=F("failures") + 1, last_failure_at=now, last_error=str(error)
+        )
+        self.refresh_from_db(fields=["state", "failures", "failure_threshold"])
+
+        if self.state == self.STATE_HALF_OPEN or (
+            self.state == self.STATE_CLOSED and self.failures >= self.failure_threshold
+        ):
+            type(self).objects.filter(pk=self.pk).update(state=self.STATE_OPEN, opened_at=now)
+            self.state, self.opened_at = self.STATE_OPEN, now
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import F
 
 
 class WorkerConfiguration(models.Model):
@@ -23,7 +24,14 @@ class WorkerConfiguration(models.Model):
     uuid = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     name = models.CharField(max_length=255, unique=True)
     is_enabled = models.BooleanField(default=False)
-    sleep_seconds = models.IntegerField(default=10)
+    sleep_seconds = models.IntegerField(
+        default=10,
+        help_text="Seconds to sleep between runs; the starting point of the idle backoff.",
+    )
+    max_sleep_seconds = models.IntegerField(
+        default=60,
+        help_text="Longest sleep between runs while the worker finds no work.",
+    )
 
     log_level = models.IntegerField(
         choices=LOG_LEVEL_CHOICES,
@@ -34,6 +42,43 @@ class WorkerConfiguration(models.Model):
 
     notes = models.TextField(blank=True, default="")
 
+    # bumped by save() so running workers can tell cheaply that they must reload
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # written by the running worker, see BaseWorkerCommand._heartbeat
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_run_duration = models.FloatField(null=True, blank=True, editable=False, help_text="Seconds.")
+    items_per_second = models.FloatField(null=True, blank=True, editable=False)
+    run_latency_p50 = models.FloatField(null=True, blank=True, editable=False, help_text="Seconds.")
+    run_latency_p95 = models.FloatField(null=True, blank=True, editable=False, help_text="Seconds.")
+
     def __str__(self) -> str:
         """Return the worker name."""
         return self.name
+
+    def save(self, *args, **kwargs) -> None:  # noqa: ANN003, ANN002
+        """Bump the version on every change of an existing configuration.
+
+        The version is incremented in the database, so two saves of stale
+        copies still bump it twice, and then read back.
+
+        Args:
+        ----
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+        -------
+            None
+
+        """
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        self.version = F("version") + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version", "updated_at"}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=["version"])
@@ -1,10 +1,46 @@
+import hashlib
+import re
+import traceback
 import uuid
+from typing import TYPE_CHECKING
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from .worker_configurations import WorkerConfiguration
+
+# memory addresses and numbers vary between occurrences of the same failure
+_VOLATILE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+def error_fingerprint(exception: BaseException | None, error: str = "") -> str:
+    """Return a fingerprint identifying a kind of failure.
+
+    It is built from the exception type and the file and function of every
+    traceback frame, leaving out the message and line numbers, so the same
+    failure with different ids (or after an unrelated edit) shares a
+    fingerprint. Without an exception, the error text is used with its
+    numbers removed.
+    """
+    if exception is None:
+        normalized = _VOLATILE.sub("#", error)
+    else:
+        kind = type(exception)
+        frames = traceback.extract_tb(exception.__traceback__)
+        normalized = "\n".join(
+            [f"{kind.__module__}.{kind.__qualname__}", *(f"{frame.filename}:{frame.name}" for frame in frames)]
+        )
+    return hashlib.sha256(normalized.encode()).hexdigest()
 
 
 class WorkerError(models.Model):
-    """Store the errors encountered by the worker."""
+    """Store the errors encountered by the worker.
+
+    Repeats of an open error are counted on its row instead of adding new
+    rows; once an error is closed, the next occurrence opens a new one.
+    """
 
     ERROR_OPEN = "O"
     ERROR_CLOSED = "C"
@@ -14,6 +50,10 @@ class WorkerError(models.Model):
     error = models.TextField()
     error_status = models.CharField(max_length=1, choices=ERROR_STATUS_CHOICES, default=ERROR_OPEN)
 
+    # null for errors recorded before fingerprinting, which are never merged
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, editable=False)  # noqa: DJ001
+    occurrences = models.PositiveIntegerField(default=1, editable=False)
+
     worker = models.ForeignKey(
         "WorkerConfiguration",
         on_delete=models.CASCADE,
@@ -23,12 +63,52 @@ class WorkerError(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         """Meta options for the model."""
 
         ordering = ["-created_at"]
+        indexes = [
+            # a worker's errors in the admin, newest first
+            models.Index(fields=["worker", "created_at"]),
+            # pruning, see the prune_records worker
+            models.Index(fields=["last_seen_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "fingerprint"],
+                condition=Q(error_status="O"),
+                name="myapp_workererror_one_open_per_fingerprint",
+            ),
+        ]
 
     def __str__(self) -> str:
         """Return the worker name."""
         return self.worker.name
+
+    @classmethod
+    def record(cls, worker: "WorkerConfiguration | None", fingerprint: str, error: str, occurrences: int = 1) -> None:
+        """Count ``occurrences`` of an error on its open row, creating the row if there is none.
+
+        The first occurrence keeps its text; repeats only bump the counter and
+        ``last_seen_at``. Safe against another process recording the same
+        error at the same time.
+        """
+        now = timezone.now()
+        open_errors = cls.objects.filter(worker=worker, fingerprint=fingerprint, error_status=cls.ERROR_OPEN)
+        if open_errors.update(occurrences=F("occurrences") + occurrences, last_seen_at=now):
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    worker=worker,
+                    fingerprint=fingerprint,
+                    error=error,
+                    occurrences=occurrences,
+                    last_seen_at=now,
+                )
+        except IntegrityError:
+            # another process opened the row between our update and insert
+            open_errors.update(occurrences=F("occurrences") + occurrences, last_seen_at=now)
@@ -0,0 +1,106 @@
+"""Wake workers up when rows they care about are saved, via PostgreSQL LISTEN/NOTIFY.
+
+Models are registered with ``notify_on_save`` (usually in ``AppConfig.ready``)
+in every process that writes them. After the saving transaction commits, a
+``NOTIFY`` is sent on the model's channel. A worker that declares the model in
+``WAKE_ON`` waits on its connection socket with a ``Listener`` instead of
+sleeping, so it starts work as soon as the row is committed.
+
+On other databases (SQLite) nothing is sent and workers keep polling.
+"""
+
+from __future__ import annotations
+
+import select
+from typing import TYPE_CHECKING
+
+from django.db import InterfaceError, OperationalError, connection, transaction
+from django.db.models.signals import post_save
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from django.db.models import Model
+
+
+def channel_name(model: type[Model]) -> str:
+    """Return the notification channel of a model, e.g. ``organizations_invitation``."""
+    return f"{model._meta.app_label}_{model._meta.model_name}"  # noqa: SLF001
+
+
+def notifications_supported() -> bool:
+    """Return True if the database supports LISTEN/NOTIFY."""
+    return connection.vendor == "postgresql"
+
+
+def notify(model: type[Model]) -> None:
+    """Wake the workers listening on ``model`` once the current transaction commits.
+
+    Call this directly after writes that send no ``post_save``, such as
+    ``bulk_create``.
+    """
+    if notifications_supported():
+        transaction.on_commit(lambda: _send(channel_name(model)))
+
+
+def _send(channel: str) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, '')", [channel])
+
+
+def _notify_on_save(sender: type[Model], **kwargs) -> None:  # noqa: ANN003, ARG001
+    notify(sender)
+
+
+def notify_on_save(model: type[Model]) -> None:
+    """Send a notification on the model's channel whenever an instance is saved."""
+    post_save.connect(_notify_on_save, sender=model, dispatch_uid=f"notify_on_save:{channel_name(model)}")
+
+
+class Listener:
+    """Wait for notifications on a set of channels, using the default connection.
+
+    PostgreSQL queues the notifications of a listening session until it next
+    waits, so the worker loop calls ``listen()`` before each run: a
+    notification sent while the run works then wakes the sleep after it.
+    """
+
+    def __init__(self, channels: Iterable[str]) -> None:
+        """Remember the channels; LISTEN is issued by ``listen()``, once per connection."""
+        self.channels = list(channels)
+        self._listening_on = None
+
+    def listen(self):  # noqa: ANN201
+        """Return the psycopg2 connection, issuing LISTEN if it is a new one (after a reconnect)."""
+        connection.ensure_connection()
+        raw = connection.connection
+        if raw is not self._listening_on:
+            with connection.cursor() as cursor:
+                for channel in self.channels:
+                    cursor.execute(f"LISTEN {connection.ops.quote_name(channel)}")
+            self._listening_on = raw
+        return raw
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a notification arrives or ``timeout`` seconds pass.
+
+        Returns True if there was a notification. Notifications that arrived
+        since ``listen()`` while the worker was busy are picked up without
+        blocking. If the connection is lost, it is closed and True is
+        returned: notifications may have been missed, and the loop reconnects
+        and listens again before the next run.
+        """
+        try:
+            with connection.wrap_database_errors:
+                raw = self.listen()
+                raw.poll()
+                if not raw.notifies:
+                    select.select([raw], [], [], timeout)
+                    raw.poll()
+        except (InterfaceError, OperationalError):
+            connection.close()
+            return True
+
+        notified = bool(raw.notifies)
+        raw.notifies.clear()
+        return notified
@@ -0,0 +1,15 @@
+"""Signal receivers that keep the myapp caches consistent."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import clear_now_and_on_commit
+from .models import SiteConfiguration
+from .site_configuration import clear_site_configuration_cache
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+def invalidate_site_configuration_cache(sender, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    """Clear the cached snapshot when the site configuration changes."""
+    clear_now_and_on_commit(clear_site_configuration_cache)
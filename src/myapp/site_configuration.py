@@ -0,0 +1,58 @@
+"""Cached, pre-rendered snapshot of the SiteConfiguration singleton.
+
+Every page renders the configured script fragments, so instead of loading the
+singleton per request the fragments are rendered once per configuration
+change and kept in the default cache. With ``TieredCache`` as the default
+backend that is a process-local read; the signal in ``signals.py`` deletes the
+entry on save, which drops it from the local tier of every process.
+"""
+
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from .cache import can_cache_reads
+from .models import SiteConfiguration
+
+CACHE_KEY = "myapp:site-configuration"
+
+
+@dataclass(frozen=True)
+class SiteConfigurationSnapshot:
+    """Script fragments of the site configuration, ready to be emitted by templates.
+
+    The fragments are raw HTML entered by administrators; templates emit them
+    with ``|safe``.
+    """
+
+    js_head: str
+    js_body: str
+    js_analytics_staff: str
+    js_analytics_public: str
+
+    @classmethod
+    def from_config(cls, config: SiteConfiguration) -> "SiteConfigurationSnapshot":
+        """Render the fragments of ``config``."""
+        return cls(
+            js_head=config.js_head,
+            js_body=config.js_body,
+            js_analytics_staff=config.js_analytics if config.include_staff_in_analytics else "",
+            js_analytics_public=config.js_analytics,
+        )
+
+
+def get_site_configuration() -> SiteConfigurationSnapshot:
+    """Return the snapshot of the site configuration, from the cache when possible."""
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot = SiteConfigurationSnapshot.from_config(SiteConfiguration.get_solo())
+    if can_cache_reads():
+        cache.set(CACHE_KEY, snapshot, timeout=None)
+    return snapshot
+
+
+def clear_site_configuration_cache() -> None:
+    """Drop the cached snapshot."""
+    cache.delete(CACHE_KEY)
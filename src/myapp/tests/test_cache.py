@@ -0,0 +1,197 @@
+"""Tests for the two-tier cache backend."""
+
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from myapp.cache import GENERATION_KEY, can_cache_reads, clear_now_and_on_commit
+
+SHARED_DIR = tempfile.mkdtemp(prefix="tiered-cache-")
+
+
+def tiered(location, **options):
+    return {
+        "BACKEND": "myapp.cache.TieredCache",
+        "LOCATION": location,
+        "OPTIONS": {"SHARED": "shared", "GENERATION_CHECK_INTERVAL": 0, **options},
+    }
+
+
+# two tiered caches on one file-based shared tier stand in for two processes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": SHARED_DIR},
+        "process_a": tiered("process_a"),
+        "process_b": tiered("process_b"),
+        "small": tiered("small", LOCAL_MAX_ENTRIES=2),
+    }
+)
+class TieredCacheTest(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SHARED_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.a = caches["process_a"]
+        self.b = caches["process_b"]
+        self.shared = caches["shared"]
+        self.a.clear()
+        # local tiers outlive a test (they are per process), start each one empty
+        for alias in ("process_a", "process_b", "small"):
+            local = caches[alias]._local
+            local.clear()
+            local.checked_at = 0.0
+
+    def test_set_writes_through(self):
+        self.a.set("key", "value")
+
+        self.assertEqual(self.shared.get("key"), "value")
+        self.assertEqual(self.b.get("key"), "value")
+
+    def test_local_hit_skips_shared_tier(self):
+        self.a.set("key", "value")
+
+        with patch.object(type(self.shared), "get", side_effect=AssertionError("shared read")):
+            # the generation check is due on every call here, so only look at the data read
+            with patch.object(type(self.a), "_check_generation"):
+                self.assertEqual(self.a.get("key"), "value")
+
+    def test_delete_is_broadcast(self):
+        self.a.set("key", "value")
+        self.assertEqual(self.b.get("key"), "value")
+
+        self.a.delete("key")
+
+        self.assertIsNone(self.b.get("key"))
+
+    def test_delete_only_drops_that_key_elsewhere(self):
+        self.a.set("key", "value")
+        self.a.set("other", "value")
+        self.b.get("key")
+        self.b.get("other")
+
+        self.a.delete("key")
+
+        self.assertIsNone(self.b.get("key"))
+        self.assertIn(self.b.make_key("other"), self.b._local.entries)
+
+    def test_incr_is_broadcast(self):
+        self.a.set("counter", 1)
+        self.assertEqual(self.b.get("counter"), 1)
+
+        self.a.incr("counter")
+
+        self.assertEqual(self.b.get("counter"), 2)
+
+    def test_invalidations_on_one_generation_drop_every_local_tier(self):
+        """A non-atomic incr can give two invalidations the same generation; neither key is kept."""
+        self.a.set("one", "value")
+        self.a.set("two", "value")
+        self.b.get("one")
+        self.b.get("two")
+        generation = self.shared.get(GENERATION_KEY) + 1
+
+        def racing_incr(key, delta=1, version=None):
+            self.shared.set(key, generation, timeout=None)
+            return generation
+
+        with patch.object(self.shared, "incr", side_effect=racing_incr):
+            self.a.delete("one")
+            self.a.delete("two")
+
+        self.assertIsNone(self.b.get("one"))
+        self.assertIsNone(self.b.get("two"))
+
+    def test_lagging_process_drops_its_whole_local_tier(self):
+        self.a.set("key", "value")
+        self.b.get("key")
+
+        with patch("myapp.cache.MAX_INVALIDATION_LAG", 1):
+            self.a.delete("one")
+            self.a.delete("two")
+            self.b.get("unrelated")
+
+        self.assertNotIn(self.b.make_key("key"), self.b._local.entries)
+
+    def test_clear_is_broadcast(self):
+        self.a.set("key", "value")
+        self.assertEqual(self.b.get("key"), "value")
+
+        self.a.clear()
+
+        self.assertIsNone(self.b.get("key"))
+
+    def test_set_elsewhere_is_stale_until_local_timeout(self):
+        """Plain sets are not broadcast: other processes keep their copy until it expires."""
+        self.a.set("key", "old")
+        self.assertEqual(self.b.get("key"), "old")
+
+        self.a.set("key", "new")
+
+        self.assertEqual(self.b.get("key"), "old")
+        with patch("myapp.cache.time.monotonic", return_value=10**9):
+            self.assertEqual(self.b.get("key"), "new")
+
+    def test_versioned_keys(self):
+        self.a.set("key", "v1", version=1)
+        self.a.set("key", "v2", version=2)
+
+        self.assertEqual(self.a.get("key", version=1), "v1")
+        self.assertEqual(self.b.get("key", version=2), "v2")
+        self.assertIsNone(self.b.get("key", version=3))
+
+    def test_local_tier_is_bounded(self):
+        small = caches["small"]
+        for key in ("one", "two", "three"):
+            small.set(key, key)
+
+        local = small._local.entries
+        self.assertEqual(list(local), [small.make_key("two"), small.make_key("three")])
+        # evicted locally, still served from the shared tier
+        self.assertEqual(small.get("one"), "one")
+
+    def test_incr_is_exact(self):
+        self.a.set("counter", 1)
+        self.b.get("counter")
+
+        self.a.incr("counter")
+        self.b.incr("counter")
+
+        self.assertEqual(self.shared.get("counter"), 3)
+
+    def test_local_values_are_copies(self):
+        value = {"items": [1]}
+        self.a.set("key", value)
+        value["items"].append(2)
+
+        self.assertEqual(self.a.get("key"), {"items": [1]})
+
+    async def test_aget_local_hit_stays_on_event_loop(self):
+        await self.a.aset("key", "value")
+        await self.a.aget("key")
+
+        with patch("asgiref.sync.SyncToAsync.__call__", side_effect=AssertionError("thread hop")):
+            with patch.object(type(self.a), "_generation_due", return_value=False):
+                self.assertEqual(await self.a.aget("key"), "value")
+
+
+class InvalidationHelpersTest(TestCase):
+    def test_reads_inside_a_transaction_are_not_cacheable(self):
+        # TestCase wraps every test in an atomic block
+        self.assertFalse(can_cache_reads())
+
+    def test_clears_now_and_again_on_commit(self):
+        calls = []
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                clear_now_and_on_commit(lambda: calls.append("clear"))
+                self.assertEqual(calls, ["clear"])
+
+        self.assertEqual(calls, ["clear", "clear"])
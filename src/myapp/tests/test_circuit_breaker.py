@@ -0,0 +1,69 @@
+"""Tests for the circuit breaker shared by workers."""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.models import CircuitBreaker
+
+
+class CircuitBreakerTest(TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker.objects.create(name="smtp", failure_threshold=3, open_seconds=60)
+
+    def open_since(self, seconds):
+        CircuitBreaker.objects.filter(pk=self.breaker.pk).update(
+            state=CircuitBreaker.STATE_OPEN, failures=3, opened_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure("down")
+
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CircuitBreaker.STATE_OPEN)
+
+    def test_success_resets_the_count(self):
+        self.breaker.record_failure("down")
+        self.breaker.record_failure("down")
+        self.breaker.record_success()
+        self.breaker.record_failure("down")
+
+        self.assertTrue(self.breaker.allow())
+
+    def test_only_one_caller_probes_after_the_interval(self):
+        self.open_since(61)
+        other = CircuitBreaker.objects.get(pk=self.breaker.pk)
+
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(other.allow())
+        self.assertEqual(self.breaker.state, CircuitBreaker.STATE_HALF_OPEN)
+
+    def test_failed_probe_reopens(self):
+        self.open_since(61)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure("still down")
+
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_probe_closes(self):
+        self.open_since(61)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_success()
+
+        self.breaker.refresh_from_db()
+        self.assertEqual((self.breaker.state, self.breaker.failures), (CircuitBreaker.STATE_CLOSED, 0))
+
+    def test_closing_by_hand_resets_the_count(self):
+        self.open_since(10)
+        self.breaker.refresh_from_db()
+
+        self.breaker.state = CircuitBreaker.STATE_CLOSED
+        self.breaker.save()
+
+        self.breaker.record_failure("down")
+        self.assertTrue(self.breaker.allow())
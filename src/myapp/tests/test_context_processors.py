@@ -0,0 +1,28 @@
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase
+
+from myapp.context_processors import site_name
+
+
+class SiteNameContextProcessorTest(TestCase):
+    def setUp(self):
+        Site.objects.clear_cache()
+        self.request = RequestFactory().get("/")
+
+    def test_unused_site_name_costs_nothing(self):
+        with self.assertNumQueries(0):
+            site_name(self.request)
+
+    def test_site_name_is_memoized(self):
+        site = Site.objects.get_current()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(str(site_name(self.request)["site_name"]), site.name)
+
+    def test_site_name_follows_site_changes(self):
+        context = site_name(self.request)
+        site = Site.objects.get_current()
+        site.name = "Renamed"
+        site.save()
+
+        self.assertEqual(str(context["site_name"]), "Renamed")
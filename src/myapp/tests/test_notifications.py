@@ -0,0 +1,168 @@
+"""Tests for LISTEN/NOTIFY worker wakeups."""
+
+import socket
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase
+
+from myapp.management.commands._base import BaseWorkerCommand
+from myapp.notifications import Listener, channel_name
+from organizations.models import Invitation, Organization
+
+
+class FakePgConnection:
+    """Stands in for a psycopg2 connection: a socket carrying one byte per notification."""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)  # noqa: FBT003
+        self.notifies = []
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def poll(self):
+        try:
+            self.notifies.extend(self.sock.recv(1024))
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        self.sock.close()
+        self.peer.close()
+
+
+class NotifyTest(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+
+    def create_invitation(self):
+        return Invitation.objects.create(organization=self.organization, email="user@example.com", invite_key=uuid.uuid4())
+
+    def test_channel_name(self):
+        self.assertEqual(channel_name(Invitation), "organizations_invitation")
+
+    def test_saving_an_invitation_notifies_after_commit(self):
+        with (
+            patch("myapp.notifications.notifications_supported", return_value=True),
+            patch("myapp.notifications._send") as mock_send,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            self.create_invitation()
+            mock_send.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        mock_send.assert_called_once_with("organizations_invitation")
+
+    def test_no_notification_without_postgresql(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_invitation()
+
+        self.assertEqual(callbacks, [])
+
+
+class ListenerTest(SimpleTestCase):
+    def setUp(self):
+        self.raw = FakePgConnection()
+        self.addCleanup(self.raw.close)
+        self.db = MagicMock(connection=self.raw)
+        self.db.ops.quote_name = lambda name: f'"{name}"'
+        patcher = patch("myapp.notifications.connection", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.listener = Listener(["organizations_invitation"])
+
+    def test_listens_once_per_connection(self):
+        self.listener.wait(0)
+        self.listener.wait(0)
+
+        cursor = self.db.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with('LISTEN "organizations_invitation"')
+
+    def test_times_out_without_notification(self):
+        start = time.monotonic()
+
+        self.assertFalse(self.listener.wait(0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_lost_connection_is_closed_and_wakes(self):
+        self.raw.poll = MagicMock(side_effect=OperationalError("server closed the connection"))
+
+        self.assertTrue(self.listener.wait(5))
+        self.db.close.assert_called_once_with()
+
+    def test_wakes_on_notification(self):
+        self.raw.peer.send(b"x")
+
+        start = time.monotonic()
+        self.assertTrue(self.listener.wait(5))
+        self.assertLess(time.monotonic() - start, 1)
+
+        # consumed
+        self.assertFalse(self.listener.wait(0))
+
+
+class Worker(BaseWorkerCommand):
+    help = "Test worker"
+    NAME = "test_worker"
+    WAKE_ON = ("organizations.Invitation",)
+
+
+class WorkerSleepTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+
+    def test_polls_without_postgresql(self):
+        self.assertIsNone(self.worker._build_listener())
+
+    def test_listens_on_wake_on_models(self):
+        with patch("myapp.management.commands._base.notifications_supported", return_value=True):
+            listener = self.worker._build_listener()
+
+        self.assertEqual(listener.channels, ["myapp_workerconfiguration", "organizations_invitation"])
+
+    def test_notification_sent_during_run_wakes_next_sleep(self):
+        raw = FakePgConnection()
+        self.addCleanup(raw.close)
+        db = MagicMock(connection=raw, errors_occurred=False)
+        db.ops.quote_name = lambda name: f'"{name}"'
+        self.worker.config.is_enabled = True
+        self.worker.config.sleep_seconds = 30
+        self.worker.config.save()
+        listen = db.cursor.return_value.__enter__.return_value.execute
+        runs = []
+
+        def run():
+            # LISTEN is registered before the run, or its notifications would be lost
+            runs.append(listen.called)
+            if len(runs) == 1:
+                # a NOTIFY from another session, delivered while the run works
+                raw.peer.send(b"x")
+            else:
+                self.worker.keep_running = False
+            return 0
+
+        with (
+            patch("myapp.management.commands._base.notifications_supported", return_value=True),
+            patch("myapp.management.commands._base.connection", db),
+            patch("myapp.notifications.connection", db),
+            patch("myapp.management.commands._base.signal.signal"),
+            patch.object(self.worker, "run", side_effect=run),
+        ):
+            start = time.monotonic()
+            self.worker.run_worker()
+
+        self.assertEqual(runs, [True, True])
+        self.assertLess(time.monotonic() - start, 5)
+        db.close.assert_not_called()
+
+    def test_notification_ends_sleep(self):
+        listener = MagicMock()
+        listener.wait.side_effect = [False, True]
+
+        self.worker._sleep(10, listener)
+
+        self.assertEqual(listener.wait.call_count, 2)
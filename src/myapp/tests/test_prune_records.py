@@ -0,0 +1,54 @@
+"""Tests for the retention worker."""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.management.commands.prune_records import Command
+from myapp.models import WorkerError
+from organizations.models import InvitationLog, Organization
+
+
+class PruneRecordsTest(TestCase):
+    def setUp(self):
+        self.command = Command()
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        now = timezone.now()
+        logs = InvitationLog.objects.bulk_create(
+            InvitationLog(organization=self.organization, email_hash=str(i)) for i in range(30)
+        )
+        # created_at is auto_now_add, so age the rows afterwards: 25 expired, 5 recent
+        for log in logs[:25]:
+            InvitationLog.objects.filter(pk=log.pk).update(created_at=now - timedelta(days=400 + int(log.email_hash)))
+
+        WorkerError.objects.create(worker=self.command.config, error="old", last_seen_at=now - timedelta(days=100))
+        WorkerError.objects.create(worker=self.command.config, error="recent")
+
+    def configure(self, **custom):
+        self.command.config.custom = custom
+        self.command.config.save()
+
+    def test_deletes_expired_rows_in_batches(self):
+        self.configure(prune_batch_size=10)
+
+        # a select and a delete per batch, and a select that finds nothing per table
+        with self.assertNumQueries(2 * 3 + 1 + 2 + 1):
+            deleted = self.command.run()
+
+        self.assertEqual(deleted, 26)
+        self.assertEqual(InvitationLog.objects.count(), 5)
+        self.assertEqual(list(WorkerError.objects.values_list("error", flat=True)), ["recent"])
+
+    def test_retention_is_configurable(self):
+        self.configure(retention_days={"organizations.InvitationLog": 410, "myapp.WorkerError": 0})
+
+        self.command.run()
+
+        self.assertEqual(InvitationLog.objects.count(), 15)
+        self.assertEqual(WorkerError.objects.count(), 2)
+
+    def test_idle_run_reports_no_work(self):
+        self.command.run()
+
+        self.assertEqual(self.command.run(), 0)
@@ -0,0 +1,72 @@
+"""Tests for the cached site configuration snapshot."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+
+from myapp.models import SiteConfiguration
+from myapp.site_configuration import clear_site_configuration_cache, get_site_configuration
+
+User = get_user_model()
+
+
+class SiteConfigurationCacheTest(TransactionTestCase):
+    """The snapshot is only cached outside transactions, so these tests run in autocommit."""
+
+    def setUp(self):
+        clear_site_configuration_cache()
+        self.addCleanup(clear_site_configuration_cache)
+        self.config = SiteConfiguration.get_solo()
+        self.config.js_head = "<script>head()</script>"
+        self.config.save()
+
+    def test_repeated_reads_do_not_query(self):
+        self.assertEqual(get_site_configuration().js_head, "<script>head()</script>")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_site_configuration().js_head, "<script>head()</script>")
+
+    def test_save_invalidates_cache(self):
+        get_site_configuration()
+
+        self.config.js_head = "<script>changed()</script>"
+        self.config.save()
+
+        self.assertEqual(get_site_configuration().js_head, "<script>changed()</script>")
+
+    def test_pages_do_not_query_the_configuration(self):
+        self.client.get("/")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/")
+        self.assertContains(response, "<script>head()</script>", html=False)
+
+
+class SiteConfigurationSnapshotTest(TestCase):
+    def setUp(self):
+        self.config = SiteConfiguration.get_solo()
+        self.config.js_body = "<script>body()</script>"
+        self.config.js_analytics = "<script>analytics()</script>"
+        self.config.save()
+
+    def test_analytics_excludes_staff_by_default(self):
+        snapshot = get_site_configuration()
+
+        self.assertEqual(snapshot.js_analytics_public, "<script>analytics()</script>")
+        self.assertEqual(snapshot.js_analytics_staff, "")
+
+    def test_analytics_includes_staff_when_configured(self):
+        self.config.include_staff_in_analytics = True
+        self.config.save()
+
+        self.assertEqual(get_site_configuration().js_analytics_staff, "<script>analytics()</script>")
+
+    def test_base_template_emits_fragments(self):
+        response = self.client.get("/")
+        self.assertContains(response, "<script>body()</script>", html=False)
+        self.assertContains(response, "<script>analytics()</script>", html=False)
+
+        staff = User.objects.create_user(username="staff", password="password", is_staff=True)  # noqa: S106
+        self.client.force_login(staff)
+        response = self.client.get("/")
+        self.assertContains(response, "<script>body()</script>", html=False)
+        self.assertNotContains(response, "<script>analytics()</script>", html=False)
@@ -0,0 +1,86 @@
+"""Tests for the --processes supervisor."""
+
+import os
+import signal
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.test import TransactionTestCase
+
+from myapp.management.commands._base import BaseWorkerCommand
+from myapp.management.commands._supervisor import Supervisor
+
+
+class SupervisedWorker(BaseWorkerCommand):
+    """Stands in for a worker loop: does a little, then waits for SIGTERM."""
+
+    help = "Test supervised worker"
+    NAME = "test_supervised_worker"
+
+    def run_worker(self):
+        signal.signal(signal.SIGTERM, self.signal_handler)
+        self.start_up()
+        while self.keep_running:
+            time.sleep(0.01)
+
+    def start_up(self):
+        pass
+
+
+class SupervisorTest(TransactionTestCase):
+    def run_supervisor(self, worker, processes, until):
+        supervisor = Supervisor(worker, processes)
+        supervisor.poll_interval = 0.05
+        supervisor.restart_delay = 0
+        supervisor.shutdown_timeout = 5
+
+        def stop_when_done():
+            deadline = time.monotonic() + 10
+            while not until(supervisor) and time.monotonic() < deadline:
+                time.sleep(0.02)
+            supervisor.stop()
+
+        stopper = threading.Thread(target=stop_when_done)
+        stopper.start()
+        supervisor.run()
+        stopper.join()
+        return supervisor
+
+    def test_crashed_children_are_restarted(self):
+        starts = Path(tempfile.mkdtemp()) / "starts"
+        starts.touch()
+
+        class CrashingWorker(SupervisedWorker):
+            def start_up(self):
+                with starts.open("a") as f:
+                    f.write(f"{os.getpid()}\n")
+                if len(starts.read_text().splitlines()) < 3:
+                    os._exit(3)
+
+        supervisor = self.run_supervisor(
+            CrashingWorker(), 1, until=lambda _: len(starts.read_text().splitlines()) >= 3
+        )
+
+        self.assertEqual(supervisor.metrics[0].restarts, 2)
+        self.assertEqual(len(set(starts.read_text().splitlines())), 3)
+
+    def test_metrics_are_aggregated_and_children_stop_on_sigterm(self):
+        class ReportingWorker(SupervisedWorker):
+            def start_up(self):
+                self._record_run(5, 0.25)
+                self._record_run(5, 0.25)
+
+        supervisor = self.run_supervisor(
+            ReportingWorker(), 2, until=lambda s: sum(m.runs for m in s.metrics.values()) >= 4
+        )
+
+        for slot in (0, 1):
+            with self.subTest(slot=slot):
+                self.assertEqual(supervisor.metrics[slot].runs, 2)
+                self.assertEqual(supervisor.metrics[slot].items, 10)
+                self.assertEqual(supervisor.metrics[slot].items_per_second, 20)
+                self.assertEqual(supervisor.metrics[slot].restarts, 0)
+                # stopped by the forwarded SIGTERM, not killed
+                self.assertEqual(supervisor.children[slot].exitcode, 0)
@@ -0,0 +1,442 @@
+"""Tests for the base worker command."""
+
+import asyncio
+import signal
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from myapp.management.commands._base import AsyncBaseWorkerCommand, BaseWorkerCommand
+from myapp.management.commands._metrics import RunMetrics
+from myapp.models import WorkerConfiguration, WorkerError
+
+
+class Worker(BaseWorkerCommand):
+    help = "Test worker"
+    NAME = "test_worker"
+    ATOMIC_RUN = False
+
+
+class ClaimBatchesTest(TransactionTestCase):
+    """Each batch commits on its own, so these tests run in autocommit."""
+
+    def setUp(self):
+        self.worker = Worker()
+        WorkerError.objects.bulk_create(WorkerError(worker=self.worker.config, error=f"error {i}") for i in range(25))
+        self.queue = WorkerError.objects.order_by("error")
+
+    def delete_batch(self, batch):
+        WorkerError.objects.filter(pk__in=[error.pk for error in batch]).delete()
+
+    def test_claims_in_batches_until_empty(self):
+        sizes = []
+
+        def handler(batch):
+            sizes.append(len(batch))
+            self.delete_batch(batch)
+
+        claimed = self.worker.claim_batches(self.queue, handler, batch_size=10)
+
+        self.assertEqual(claimed, 25)
+        self.assertEqual(sizes, [10, 10, 5])
+
+    def test_failing_batch_rolls_back_alone(self):
+        def handler(batch):
+            self.delete_batch(batch)
+            if WorkerError.objects.count() < 10:
+                raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.worker.claim_batches(self.queue, handler, batch_size=10)
+
+        # the first batch committed, the second rolled back
+        self.assertEqual(WorkerError.objects.count(), 15)
+
+    def test_handler_can_stop_claiming(self):
+        claimed = self.worker.claim_batches(self.queue, lambda batch: self.delete_batch(batch) or False, batch_size=10)
+
+        self.assertEqual(claimed, 10)
+        self.assertEqual(WorkerError.objects.count(), 15)
+
+    def test_stopping_worker_stops_claiming(self):
+        self.worker.keep_running = False
+
+        self.assertEqual(self.worker.claim_batches(self.queue, self.delete_batch), 0)
+
+
+class ClaimLeaseTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+
+    def test_lease_is_set_on_postgresql(self):
+        self.worker.config.custom = {"claim_lease_seconds": 30}
+        mock_connection = MagicMock(vendor="postgresql")
+
+        with patch("myapp.management.commands._base.connection", mock_connection):
+            self.worker._set_claim_lease()
+
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with("SET LOCAL idle_in_transaction_session_timeout = '30s'")
+
+    def test_no_lease_on_other_backends(self):
+        with self.assertNumQueries(0):
+            self.worker._set_claim_lease()
+
+
+class ReplaceBrokenConnectionTest(TestCase):
+    """The loop keeps its connection, and replaces it only after a failed query left it unusable."""
+
+    def setUp(self):
+        self.worker = Worker()
+
+    def replace(self, **state):
+        mock_connection = MagicMock(**state)
+        with patch("myapp.management.commands._base.connection", mock_connection):
+            self.worker._replace_broken_connection()
+        return mock_connection
+
+    def test_healthy_connection_is_kept_without_a_query(self):
+        mock_connection = self.replace(errors_occurred=False)
+
+        mock_connection.is_usable.assert_not_called()
+        mock_connection.close.assert_not_called()
+
+    def test_connection_ended_by_the_server_is_closed(self):
+        mock_connection = self.replace(errors_occurred=True, **{"is_usable.return_value": False})
+
+        mock_connection.close.assert_called_once_with()
+
+    def test_connection_still_usable_after_an_error_is_kept(self):
+        mock_connection = self.replace(errors_occurred=True, **{"is_usable.return_value": True})
+
+        mock_connection.close.assert_not_called()
+        self.assertFalse(mock_connection.errors_occurred)
+
+
+class BackoffTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+        self.worker.config.sleep_seconds = 2
+        self.worker.config.max_sleep_seconds = 15
+
+    def test_busy_runs_do_not_sleep(self):
+        self.assertEqual(self.worker._next_sleep(100), 0)
+
+    def test_idle_runs_back_off_to_maximum(self):
+        sleeps = [self.worker._next_sleep(0) for _ in range(6)]
+
+        self.assertEqual(sleeps, [2, 4, 8, 15, 15, 15])
+
+    def test_work_resets_backoff(self):
+        self.worker._next_sleep(0)
+        self.worker._next_sleep(0)
+        self.worker._next_sleep(1)
+
+        self.assertEqual(self.worker._next_sleep(0), 2)
+
+    def test_no_work_count_keeps_fixed_sleep(self):
+        self.worker._next_sleep(0)
+        self.worker._next_sleep(0)
+
+        self.assertEqual(self.worker._next_sleep(None), 2)
+        self.assertEqual(self.worker._next_sleep(None), 2)
+
+    def test_maximum_below_minimum_uses_minimum(self):
+        self.worker.config.max_sleep_seconds = 1
+
+        self.assertEqual([self.worker._next_sleep(0) for _ in range(2)], [2, 2])
+
+    def test_zero_sleep_still_backs_off_when_idle(self):
+        self.worker.config.sleep_seconds = 0
+
+        self.assertEqual([self.worker._next_sleep(0) for _ in range(5)], [1, 2, 4, 8, 15])
+        self.assertEqual(self.worker._next_sleep(None), 0)
+
+    def test_handle_sleeps_according_to_work(self):
+        self.worker.config.is_enabled = True
+        self.worker.config.save()
+        results = iter([5, 3, 0, 0])
+        sleeps = []
+
+        def sleep(seconds, listener):
+            sleeps.append(seconds)
+            self.worker.keep_running = len(sleeps) < 4
+
+        with (
+            patch.object(self.worker, "run", side_effect=lambda: next(results)),
+            patch.object(self.worker, "_sleep", side_effect=sleep),
+            patch("myapp.management.commands._base.signal.signal"),
+        ):
+            self.worker.handle()
+
+        self.assertEqual(sleeps, [0, 0, 2, 4])
+
+
+class AsyncWorker(AsyncBaseWorkerCommand):
+    help = "Test async worker"
+    NAME = "test_async_worker"
+
+
+class AsyncWorkerTest(TransactionTestCase):
+    def setUp(self):
+        self.worker = AsyncWorker()
+        self.worker.config.is_enabled = True
+        self.worker.config.custom = {"concurrency": 3}
+        self.worker.config.save()
+        self.worker._add_signal_handlers = lambda loop: None
+
+    async def test_spawn_respects_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        self.worker._update_concurrency()
+        for _ in range(10):
+            await self.worker.spawn(job())
+            # spawning waits for a free slot, so tasks never pile up
+            self.assertLessEqual(sum(not task.done() for task in self.worker._tasks), 3)
+        await self.worker.drain()
+
+        self.assertEqual(peak, 3)
+
+    async def test_failing_task_is_recorded(self):
+        async def job():
+            raise ValueError("webhook failed")
+
+        await (await self.worker.spawn(job()))
+
+        error = await WorkerError.objects.aget(worker=self.worker.config)
+        self.assertIn("webhook failed", error.error)
+
+    async def test_stop_drains_in_flight_tasks(self):
+        finished = []
+
+        async def job():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+        async def run():
+            await self.worker.spawn(job())
+            self.worker.signal_handler(signal.SIGTERM, None)
+
+        self.worker.run = run
+        await asyncio.wait_for(self.worker.ahandle(), timeout=5)
+
+        self.assertEqual(finished, [True])
+
+    async def test_drain_cancels_tasks_after_timeout(self):
+        self.worker.config.custom = {"drain_seconds": 0}
+
+        async def job():
+            await asyncio.sleep(60)
+
+        task = await self.worker.spawn(job())
+        await self.worker.drain()
+
+        self.assertTrue(task.cancelled())
+
+    async def test_run_ends_when_its_tasks_finish(self):
+        runs = []
+
+        async def job():
+            await asyncio.sleep(0.05)
+
+        async def run():
+            runs.append(len(self.worker._tasks))
+            if len(runs) == 2:
+                self.worker.signal_handler(signal.SIGTERM, None)
+            await self.worker.spawn(job())
+            return 1
+
+        self.worker.run = run
+        await asyncio.wait_for(self.worker.ahandle(), timeout=5)
+
+        # the second run started with nothing in flight, and runs are timed with their tasks
+        self.assertEqual(runs, [0, 0])
+        self.assertGreaterEqual(self.worker.run_metrics.runs[0][1], 0.05)
+
+    async def test_stop_interrupts_sleep(self):
+        async def run():
+            asyncio.get_running_loop().call_later(0.05, self.worker.signal_handler, signal.SIGTERM, None)
+
+        self.worker.config.sleep_seconds = 60
+        await self.worker.config.asave()
+        self.worker.run = run
+
+        await asyncio.wait_for(self.worker.ahandle(), timeout=5)
+
+        self.assertFalse(self.worker.keep_running)
+
+
+class RunMetricsTest(SimpleTestCase):
+    def test_empty(self):
+        self.assertEqual(RunMetrics().fields(), {})
+
+    def test_latency_percentiles(self):
+        metrics = RunMetrics()
+        for seconds in range(1, 21):
+            metrics.record(1, seconds / 10)
+
+        fields = metrics.fields()
+
+        self.assertEqual(fields["last_run_duration"], 2.0)
+        self.assertEqual(fields["run_latency_p50"], 1.0)
+        self.assertEqual(fields["run_latency_p95"], 1.9)
+
+    def test_throughput_over_wall_time(self):
+        metrics = RunMetrics()
+        with patch("myapp.management.commands._metrics.time.monotonic", side_effect=[11.0, 20.0]):
+            metrics.record(10, 1.0)  # ran from 10s to 11s
+            metrics.record(30, 2.0)  # ran from 18s to 20s
+
+        self.assertEqual(metrics.fields()["items_per_second"], 4.0)
+
+    def test_window_is_bounded(self):
+        metrics = RunMetrics(window=3)
+        for seconds in (9, 1, 1, 1):
+            metrics.record(0, seconds)
+
+        self.assertEqual(metrics.fields()["run_latency_p95"], 1)
+
+
+class HeartbeatTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+
+    def test_heartbeat_is_one_update(self):
+        self.worker._record_run(10, 0.5)
+
+        with self.assertNumQueries(1):
+            self.worker._heartbeat()
+
+        self.worker.config.refresh_from_db()
+        self.assertIsNotNone(self.worker.config.last_heartbeat_at)
+        self.assertEqual(self.worker.config.last_run_duration, 0.5)
+        self.assertEqual(self.worker.config.run_latency_p95, 0.5)
+
+    def test_heartbeat_is_throttled(self):
+        self.worker._heartbeat()
+
+        with self.assertNumQueries(0):
+            self.worker._heartbeat()
+
+        self.worker.config.custom = {"heartbeat_seconds": 0}
+        with self.assertNumQueries(1):
+            self.worker._heartbeat()
+
+    def test_heartbeat_keeps_configuration(self):
+        self.worker._heartbeat()
+        self.worker.config.refresh_from_db()
+
+        self.assertEqual(self.worker.config.sleep_seconds, 10)
+        self.assertIsNone(self.worker.config.items_per_second)
+
+
+class ConfigVersionTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+
+    def test_save_bumps_version(self):
+        config = self.worker.config
+        version = config.version
+
+        config.sleep_seconds = 3
+        config.save()
+        config.save(update_fields=["sleep_seconds"])
+
+        config.refresh_from_db()
+        self.assertEqual(config.version, version + 2)
+
+    def test_concurrent_saves_both_bump_version(self):
+        version = self.worker.config.version
+        first = WorkerConfiguration.objects.get(pk=self.worker.config.pk)
+        second = WorkerConfiguration.objects.get(pk=self.worker.config.pk)
+
+        first.save()
+        second.save()
+
+        self.assertEqual(second.version, version + 2)
+        self.assertEqual(WorkerConfiguration.objects.get(pk=self.worker.config.pk).version, version + 2)
+
+    def test_metrics_update_does_not_bump_version(self):
+        version = self.worker.config.version
+
+        self.worker._heartbeat()
+
+        self.assertEqual(WorkerConfiguration.objects.get(pk=self.worker.config.pk).version, version)
+
+    def test_unchanged_config_is_not_reloaded(self):
+        with self.assertNumQueries(1):
+            self.worker._refresh_config()
+
+    def test_changed_config_is_reloaded(self):
+        stored = WorkerConfiguration.objects.get(pk=self.worker.config.pk)
+        stored.custom = {"batch_size": 5}
+        stored.save()
+
+        with self.assertNumQueries(2):
+            self.worker._refresh_config()
+
+        self.assertEqual(self.worker.config.custom, {"batch_size": 5})
+
+
+class ErrorRecordingTest(TestCase):
+    def setUp(self):
+        self.worker = Worker()
+
+    def fail(self, item_id):
+        try:
+            raise ValueError(f"item {item_id} is broken")
+        except ValueError as e:
+            self.worker._log_crawl_error(e)
+
+    def test_repeats_share_a_row(self):
+        for item_id in range(3):
+            self.fail(item_id)
+
+        error = WorkerError.objects.get(worker=self.worker.config)
+        self.assertEqual(error.occurrences, 3)
+        self.assertIn("item 0 is broken", error.error)
+        self.assertGreaterEqual(error.last_seen_at, error.created_at)
+
+    def test_failing_run_is_recorded_and_counts_as_idle(self):
+        self.worker.run = MagicMock(side_effect=RuntimeError("boom"))
+
+        self.assertEqual(self.worker._run_once(), 0)
+
+        self.assertIn("boom", WorkerError.objects.get(worker=self.worker.config).error)
+
+    def test_distinct_failures_get_their_own_rows(self):
+        self.fail(1)
+        self.worker._log_crawl_error(KeyError("missing"))
+
+        self.assertEqual(WorkerError.objects.filter(worker=self.worker.config).count(), 2)
+
+    def test_closed_error_is_reopened_as_a_new_row(self):
+        self.fail(1)
+        WorkerError.objects.update(error_status=WorkerError.ERROR_CLOSED)
+
+        self.fail(2)
+
+        self.assertEqual(WorkerError.objects.filter(error_status=WorkerError.ERROR_OPEN).count(), 1)
+        self.assertEqual(WorkerError.objects.count(), 2)
+
+    def test_writes_are_rate_limited_and_flushed_later(self):
+        self.worker.config.custom = {"error_writes_per_minute": 2}
+
+        with self.assertNumQueries(5):
+            # insert (update, savepoint, insert, release), then one update, then only counting
+            for item_id in range(10):
+                self.fail(item_id)
+        self.assertEqual(WorkerError.objects.get().occurrences, 2)
+
+        with patch("myapp.management.commands._errors.time.monotonic", return_value=10**9):
+            self.worker._heartbeat()
+
+        self.assertEqual(WorkerError.objects.get().occurrences, 10)
@@ -24,10 +24,10 @@ class OrganizationMemberAdmin(admin.ModelAdmin):
 class InvitationAdmin(admin.ModelAdmin):
     """Invitation Admin."""
 
-    list_display = ("organization", "email", "role", "email_sent")
-    list_filter = ("role", "organization", "email_sent")
+    list_display = ("organization", "email", "role", "email_sent", "email_failed")
+    list_filter = ("role", "organization", "email_sent", "email_failed")
     search_fields = ("organization__name", "email")
-    list_editable = ("email_sent",)
+    list_editable = ("email_sent", "email_failed")
 
 
 @admin.register(InvitationLog)
@@ -38,3 +38,6 @@ class InvitationLogAdmin(admin.ModelAdmin):
     search_fields = ("organization__name", "email_hash")
     list_filter = ("organization",)
     readonly_fields = ("organization", "email_hash", "message", "created_at")
+    ordering = ("-created_at",)
+    # every invitation event adds a log row, so skip the total count next to a filtered count
+    show_full_result_count = False
@@ -6,3 +6,11 @@ class OrganizationsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "organizations"
+
+    def ready(self) -> None:
+        """Connect the membership cache signals and wake the invitation sender on saves."""
+        from myapp.notifications import notify_on_save  # noqa: PLC0415
+
+        from . import signals  # noqa: F401, PLC0415
+
+        notify_on_save(self.get_model("Invitation"))
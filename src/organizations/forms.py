@@ -1,9 +1,22 @@
 """Forms for the organizations app."""
 
+import csv
+import io
+import re
+
 from django import forms
+from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.password_validation import validate_password
+from django.core.validators import validate_email
 
 from organizations.models import Invitation, Organization, OrganizationMember
+from organizations.services import MAX_BULK_INVITES
+
+# separators in a pasted list of emails
+EMAIL_SEPARATORS = re.compile(r"[\s,;]+")
+
+# invalid emails quoted back in the bulk invite error
+INVALID_EMAILS_SHOWN = 10
 
 
 class OrganizationForm(forms.ModelForm):
@@ -75,6 +88,78 @@ class OrganizationInviteForm(forms.ModelForm):
         return cleaned_data
 
 
+class BulkInviteForm(forms.Form):
+    """Form to invite a pasted list or a CSV file of emails at once."""
+
+    emails = forms.CharField(
+        widget=forms.Textarea,
+        required=False,
+        help_text="Emails separated by commas, spaces or new lines.",
+    )
+    csv_file = forms.FileField(
+        required=False,
+        label="CSV file",
+        help_text="An email column, or the emails in the first column.",
+    )
+    role = forms.ChoiceField(
+        choices=OrganizationMember.RoleChoices.choices,
+        initial=OrganizationMember.RoleChoices.MEMBER,
+    )
+
+    def clean_csv_file(self) -> list[str]:
+        """Return the emails of the uploaded CSV file."""
+        csv_file = self.cleaned_data["csv_file"]
+        if not csv_file:
+            return []
+
+        try:
+            rows = list(csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8-sig")))
+        except (UnicodeDecodeError, csv.Error) as e:
+            msg = "The file is not a valid CSV file."
+            raise forms.ValidationError(msg) from e
+
+        rows = [row for row in rows if row]
+        column = 0
+        if rows:
+            header = [cell.strip().lower() for cell in rows[0]]
+            if "email" in header:
+                column = header.index("email")
+                rows = rows[1:]
+        return [row[column] for row in rows if len(row) > column]
+
+    def clean(self) -> dict:
+        """Collect the emails of both inputs, normalized, validated and without duplicates."""
+        cleaned_data = super().clean() or {}
+
+        candidates = EMAIL_SEPARATORS.split(cleaned_data.get("emails", "")) + cleaned_data.get("csv_file", [])
+        emails, invalid, seen = [], [], set()
+        for candidate in candidates:
+            email = BaseUserManager.normalize_email(candidate.strip())
+            if not email or email.lower() in seen:
+                continue
+            seen.add(email.lower())
+            try:
+                validate_email(email)
+            except forms.ValidationError:
+                invalid.append(email)
+            else:
+                emails.append(email)
+
+        if invalid:
+            more = " and more" if len(invalid) > INVALID_EMAILS_SHOWN else ""
+            msg = f"Invalid emails: {', '.join(invalid[:INVALID_EMAILS_SHOWN])}{more}."
+            raise forms.ValidationError(msg)
+        if not emails and not self.errors:
+            msg = "Enter at least one email."
+            raise forms.ValidationError(msg)
+        if len(emails) > MAX_BULK_INVITES:
+            msg = f"At most {MAX_BULK_INVITES} emails can be invited at once."
+            raise forms.ValidationError(msg)
+
+        cleaned_data["email_list"] = emails
+        return cleaned_data
+
+
 # form to change password after invite
 class AcceptInviteChangePasswordForm(forms.Form):
     """Form to change password after accepting an invite."""
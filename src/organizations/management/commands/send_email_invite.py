@@ -1,40 +1,172 @@
+from __future__ import annotations
+
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
 
 from myapp.management.commands._base import BaseWorkerCommand
 from organizations.models import Invitation
-from organizations.services import invite_log
+from organizations.services import bulk_invite_logs
+
+# invitations claimed and marked per batch, override with config.custom["batch_size"]
+DEFAULT_BATCH_SIZE = 100
+
+# SMTP connections used in parallel, override with config.custom["connections"]
+DEFAULT_CONNECTIONS = 1
+
+# SMTP reply codes from here up are permanent failures
+SMTP_PERMANENT_FAILURE = 500
+
+
+def is_recipient_error(error: Exception) -> bool:
+    """Return True if the server refused one message for good, rather than the SMTP service failing.
+
+    A refused recipient or a permanent (5xx) rejection of the message will
+    not change on retry, and says nothing about the server's health.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPDataError) and error.smtp_code >= SMTP_PERMANENT_FAILURE
 
 
 class Command(BaseWorkerCommand):
-    """Simple Async Worker."""
+    """Send pending invitation emails in batches.
+
+    A batch is sent while its rows are claimed, so ``claim_lease_seconds``
+    must exceed the worst-case time to send ``batch_size`` emails. If the
+    lease runs out, the batch rolls back and the emails it already sent are
+    sent again.
+    """
 
     help = "Send email confirmation"
     NAME = "send_email_confirmation"
 
-    def run(self) -> None:
-        """Run the worker."""
-        self.logger.debug("I'm here, running things...")
+    # every claimed batch commits on its own, see claim_batches()
+    ATOMIC_RUN = False
+
+    WAKE_ON = ("organizations.Invitation",)
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN003, ANN002
+        """Initialize the worker."""
+        super().__init__(*args, **kwargs)
+        # set by _process_batch when the SMTP service failed during the current run
+        self._send_failed = False
+
+    def run(self) -> int:
+        """Send every pending invitation, one claimed batch at a time.
+
+        Return how many were claimed, or 0 if sending failed.
+        """
+        custom = self.config.custom or {}
+        batch_size = int(custom.get("batch_size", DEFAULT_BATCH_SIZE))
+        connections = int(custom.get("connections", DEFAULT_CONNECTIONS))
+        if connections < 1:
+            msg = f'config.custom["connections"] must be at least 1, not {connections}.'
+            raise ValueError(msg)
         site = Site.objects.get_current()
 
-        for invite in Invitation.objects.filter(email_sent=False).all():
-            msg = f"Sending email to {invite.email}"
-            self.logger.debug(msg)
+        if not self.circuit_breaker("smtp").allow():
+            self.logger.debug("The SMTP circuit breaker is open, not sending.")
+            return 0
 
-            text = f"""Join the org: {invite.organization.name}
+        pending = (
+            Invitation.objects.filter(email_sent=False, email_failed=False)
+            .select_related("organization")
+            .order_by("pk")
+        )
+        self._send_failed = False
+        claimed = self.claim_batches(
+            pending, partial(self._process_batch, site=site, connections=connections), batch_size
+        )
+        # a run that hit an SMTP failure counts as idle, so the loop backs off
+        return 0 if self._send_failed else claimed
+
+    def _process_batch(self, batch: list[Invitation], site: Site, connections: int) -> bool:
+        """Send a claimed batch and mark what was sent; return False to stop after a failure.
+
+        Invitations the server refused are marked failed so they leave the
+        queue; only a failure of the SMTP service counts against the breaker.
+        """
+        self.logger.debug("Sending %d invitation emails.", len(batch))
+        sent, rejected, error = self._send_batch(batch, site, connections)
+
+        for invite in sent:
+            invite.email_sent = True
+        for invite in rejected:
+            invite.email_failed = True
+        Invitation.objects.bulk_update(sent + rejected, ["email_sent", "email_failed"])
+        bulk_invite_logs(sent, "Email sent.")
+        bulk_invite_logs(rejected, "Email rejected by the mail server.")
+
+        if error is not None:
+            # stop here so the invitations sent so far are committed with the batch
+            self.circuit_breaker("smtp").record_failure(error)
+            self._log_crawl_error(error)
+            self._send_failed = True
+            return False
+        self.circuit_breaker("smtp").record_success()
+        return True
+
+    def _send_batch(
+        self, batch: list[Invitation], site: Site, connections: int
+    ) -> tuple[list[Invitation], list[Invitation], Exception | None]:
+        """Send a batch over ``connections`` SMTP connections in parallel.
+
+        Returns the invitations that were sent, those the server rejected,
+        and the first error if any chunk failed, so the others can still be
+        marked.
+        """
+        chunks = [chunk for chunk in (batch[i::connections] for i in range(connections)) if chunk]
+        if len(chunks) == 1:
+            results = [self._send_chunk(chunks[0], site)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                results = list(executor.map(self._send_chunk, chunks, [site] * len(chunks)))
+
+        sent = [invite for chunk_sent, _, _ in results for invite in chunk_sent]
+        rejected = [invite for _, chunk_rejected, _ in results for invite in chunk_rejected]
+        errors = [error for _, _, error in results if error is not None]
+        return sent, rejected, errors[0] if errors else None
+
+    def _send_chunk(
+        self, chunk: list[Invitation], site: Site
+    ) -> tuple[list[Invitation], list[Invitation], Exception | None]:
+        """Send a chunk of invitations over one SMTP connection.
+
+        A rejected invitation is set aside and the chunk goes on; any other
+        error ends the chunk.
+        """
+        sent, rejected = [], []
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for invite in chunk:
+                    self.logger.debug("Sending email to %s", invite.email)
+                    try:
+                        connection.send_messages([self._build_message(invite, site)])
+                    except smtplib.SMTPException as e:
+                        if not is_recipient_error(e):
+                            raise
+                        self.logger.warning("Invitation %s was rejected: %s", invite.pk, e)
+                        rejected.append(invite)
+                    else:
+                        sent.append(invite)
+        except Exception as e:  # noqa: BLE001
+            return sent, rejected, e
+        return sent, rejected, None
+
+    def _build_message(self, invite: Invitation, site: Site) -> EmailMessage:
+        text = f"""Join the org: {invite.organization.name}
 
 Click here to confirm your email: http://{site}/organizations/accept-invite/{invite.invite_key}/
 
 The Firm.
 """
-            send_mail(
-                "You've been invited to join the firm",
-                text,
-                "no-reply@agentsasylum.com",
-                [invite.email],
-                fail_silently=False,
-            )
-
-            invite.email_sent = True
-            invite.save()
-            invite_log(invite, "Email sent.")
+        return EmailMessage(
+            "You've been invited to join the firm",
+            text,
+            "no-reply@agentsasylum.com",
+            [invite.email],
+        )
@@ -0,0 +1,193 @@
+"""Answers to "what is this user's role in this organization", without a query per question.
+
+A user's memberships are kept in the default cache as ``slug -> (member id,
+organization id, role, status)``, under a key that carries a generation
+number and the user's version number. The receivers in ``signals.py`` bump
+the user's version when one of their memberships is saved or deleted, and the
+generation, which drops every entry, when an organization is changed or
+deleted. With ``TieredCache`` as the default backend, navigating between
+organization pages then needs no query for authorization.
+
+An entry is stored under the version read before its query. A request that
+read the old rows while a change was being made therefore stores them under
+the old version, where they are never read again, once the receivers bump the
+version on commit.
+
+Updates that send no signals (``QuerySet.update``, ``bulk_create``) must call
+``clear_user_memberships`` or ``clear_all_memberships`` themselves.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpRequest
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.functional import SimpleLazyObject
+
+from myapp.cache import can_cache_reads
+from organizations.models import Organization, OrganizationMember
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from django.contrib.auth.models import AnonymousUser, User
+    from django.http import HttpResponse
+
+
+CACHE_PREFIX = "organizations:memberships"
+GENERATION_KEY = f"{CACHE_PREFIX}:generation"
+VERSION_KEY = f"{CACHE_PREFIX}:version:{{user_id}}"
+
+# entries of past generations and versions are left to expire
+CACHE_TIMEOUT = 60 * 60
+
+
+def _counter(key: str) -> int:
+    """Return the value of a version counter, starting it if it is missing."""
+    value = cache.get(key)
+    if value is None:
+        # seeded from the clock so an evicted counter never repeats an old value
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def _bump(key: str) -> None:
+    """Move a version counter on, past every value it has had."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _cache_key(user_id: int) -> str:
+    version = _counter(VERSION_KEY.format(user_id=user_id))
+    return f"{CACHE_PREFIX}:{_counter(GENERATION_KEY)}:{user_id}:{version}"
+
+
+def get_user_memberships(user_id: int) -> dict[str, tuple]:
+    """Return ``slug -> (member id, organization id, role, status)`` for a user, from the cache when possible."""
+    key = _cache_key(user_id)
+    memberships = cache.get(key)
+    if memberships is not None:
+        return memberships
+
+    rows = OrganizationMember.objects.filter(user_id=user_id).values_list(
+        "organization__slug", "id", "organization_id", "role", "status"
+    )
+    memberships = {slug: tuple(values) for slug, *values in rows}
+    if can_cache_reads():
+        cache.set(key, memberships, timeout=CACHE_TIMEOUT)
+    return memberships
+
+
+def clear_user_memberships(user_id: int) -> None:
+    """Drop the cached memberships of one user, by moving them to a new version."""
+    key = _cache_key(user_id)
+    _bump(VERSION_KEY.format(user_id=user_id))
+    # with TieredCache, a delete also drops the local copies of every process
+    cache.delete(key)
+
+
+def clear_all_memberships() -> None:
+    """Drop the cached memberships of every user, by moving to a new generation."""
+    _bump(GENERATION_KEY)
+
+
+class MembershipResolver:
+    """All memberships of one user, loaded on first use from the cache or with a single query.
+
+    One resolver lives on ``request.org_memberships`` and on the request's
+    user as ``user.org_memberships``, so views, forms
+    (``Organization.is_owner`` and ``has_admin_permission``) and template
+    tags (``get_user_role``) share it. It does not see changes made later in
+    the same request; call ``clear()`` after changing the user's memberships
+    if the request reads them again.
+    """
+
+    def __init__(self, user: User | AnonymousUser) -> None:
+        """Remember the user; nothing is loaded yet."""
+        self.user = user
+        self._by_slug: dict[str, OrganizationMember] | None = None
+
+    @property
+    def members(self) -> dict[str, OrganizationMember]:
+        """Return the user's memberships by organization slug.
+
+        The members are built from the cache; their ``organization`` is
+        loaded by primary key when first accessed.
+        """
+        if self._by_slug is None:
+            if not self.user.is_authenticated:
+                self._by_slug = {}
+            else:
+                # from_db takes the values in the order of the model's fields
+                self._by_slug = {
+                    slug: OrganizationMember.from_db(
+                        DEFAULT_DB_ALIAS,
+                        ["id", "organization_id", "user_id", "role", "status"],
+                        [member_id, organization_id, self.user.pk, role, status],
+                    )
+                    for slug, (member_id, organization_id, role, status) in get_user_memberships(self.user.pk).items()
+                }
+        return self._by_slug
+
+    def clear(self) -> None:
+        """Forget the loaded memberships; the next lookup loads them again."""
+        self._by_slug = None
+
+    def get(self, organization: Organization | str) -> OrganizationMember | None:
+        """Return the user's membership of an organization (or slug), or None."""
+        slug = organization.slug if isinstance(organization, Organization) else organization
+        return self.members.get(slug)
+
+    def get_or_404(self, slug: str) -> OrganizationMember:
+        """Return the user's membership of the organization ``slug``, or raise Http404."""
+        member = self.get(slug)
+        if member is None:
+            msg = "No organization matches the given query."
+            raise Http404(msg)
+        return member
+
+    def role(self, organization: Organization | str) -> str | None:
+        """Return the user's role in an organization, or None if not a member."""
+        member = self.get(organization)
+        return member.role if member else None
+
+    def is_owner(self, organization: Organization | str) -> bool:
+        """Return True if the user is an owner of the organization."""
+        return self.role(organization) == OrganizationMember.RoleChoices.OWNER
+
+
+class MembershipRequest(HttpRequest):
+    """The type of the requests that went through ``org_memberships_middleware``, for annotating views."""
+
+    org_memberships: MembershipResolver
+
+
+def memberships_for(user: User | AnonymousUser) -> MembershipResolver:
+    """Return the resolver of ``user``, creating it and attaching it to the user on first use."""
+    memberships = getattr(user, "org_memberships", None)
+    if memberships is None:
+        memberships = MembershipResolver(user)
+        user.org_memberships = memberships  # type: ignore[union-attr]
+    return memberships
+
+
+@sync_and_async_middleware
+def org_memberships_middleware(get_response: Callable) -> Callable:
+    """Attach a lazy ``request.org_memberships``; it must come after AuthenticationMiddleware."""
+
+    def middleware(request: MembershipRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        request.org_memberships = SimpleLazyObject(lambda: memberships_for(request.user))  # type: ignore[assignment]
+        return get_response(request)
+
+    if iscoroutinefunction(get_response):
+        # returns get_response's coroutine, which the handler awaits
+        markcoroutinefunction(middleware)
+    return middleware
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0006_alter_invitation_user_invitationlog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitationlog',
+            index=models.Index(fields=['created_at'], name='organizatio_created_279041_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitationlog',
+            index=models.Index(fields=['organization', 'created_at'], name='organizatio_organiz_6b48e0_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0007_invitationlog_organizatio_created_279041_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['organization', 'email'], name='invitation_org_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(condition=models.Q(('email_sent', False)), fields=['id'], name='invitation_unsent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organizationmember',
+            index=models.Index(fields=['organization', 'role'], name='org_member_org_role_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0008_access_pattern_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizationmember',
+            name='role_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(role='OWNER', then=models.Value(0)), models.When(role='ADMIN', then=models.Value(1)), models.When(role='MEMBER', then=models.Value(2)), default=models.Value(3)), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='organizationmember',
+            index=models.Index(fields=['organization', 'role_rank', 'id'], name='org_member_roster_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0009_roster_role_rank'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invitation',
+            name='invitation_unsent_idx',
+        ),
+        migrations.AddField(
+            model_name='invitation',
+            name='email_failed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(condition=models.Q(('email_failed', False), ('email_sent', False)), fields=['id'], name='invitation_unsent_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0010_invitation_email_failed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['organization', 'id'], name='invitation_org_id_idx'),
+        ),
+    ]
@@ -55,11 +55,14 @@ class Organization(models.Model):
             bool
 
         """
-        return self.members.filter(user=user, role=OrganizationMember.RoleChoices.OWNER).exists()
+        return self.is_owner(user)
 
     def is_owner(self, user: User) -> bool:
         """Return True if the user is an owner of the organization.
 
+        Answered from the user's ``org_memberships`` resolver when the request
+        attached one (see ``organizations.memberships``), without a query.
+
         Args:
         ----
             user: User object.
@@ -69,6 +72,9 @@ class Organization(models.Model):
             bool
 
         """
+        memberships = getattr(user, "org_memberships", None)
+        if memberships is not None:
+            return memberships.is_owner(self)
         return self.members.filter(user=user, role=OrganizationMember.RoleChoices.OWNER).exists()
 
     @property
@@ -110,12 +116,32 @@ class OrganizationMember(models.Model):
     role = models.CharField(max_length=20, choices=RoleChoices.choices, default=RoleChoices.MEMBER)
     status = models.CharField(max_length=20, choices=StatusChoices.choices, default=StatusChoices.ACTIVE)
 
+    # roster order: owners first, then admins, then members. Computed by the
+    # database, so it is right after bulk_create and update() too, and indexed
+    # with the id so the roster is paged on the index.
+    role_rank = models.GeneratedField(
+        expression=models.Case(
+            models.When(role=RoleChoices.OWNER, then=models.Value(0)),
+            models.When(role=RoleChoices.ADMIN, then=models.Value(1)),
+            models.When(role=RoleChoices.MEMBER, then=models.Value(2)),
+            default=models.Value(3),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
+
     class Meta:
         """Meta options for the organization member model."""
 
         unique_together = ["organization", "user"]
         verbose_name = "organization member"
         verbose_name_plural = "organization members"
+        indexes = [
+            # owners, admins and owners.count() of an organization
+            models.Index(fields=["organization", "role"], name="org_member_org_role_idx"),
+            # the roster, see organizations.services.get_roster_page
+            models.Index(fields=["organization", "role_rank", "id"], name="org_member_roster_idx"),
+        ]
 
     def __str__(self) -> str:
         """Return the name of the organization member."""
@@ -158,6 +184,8 @@ class Invitation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     accepted_at = models.DateTimeField(null=True, blank=True)
     email_sent = models.BooleanField(default=False)
+    # the mail server refused the email for good; the sender does not retry it
+    email_failed = models.BooleanField(default=False)
     invite_key = models.UUIDField(unique=True)
 
     class Meta:
@@ -165,6 +193,16 @@ class Invitation(models.Model):
 
         verbose_name = "invitation"
         verbose_name_plural = "invitations"
+        indexes = [
+            # the already-invited checks of the invite forms
+            models.Index(fields=["organization", "email"], name="invitation_org_email_idx"),
+            # the keyset-paginated pending invitations of the organization detail page
+            models.Index(fields=["organization", "id"], name="invitation_org_id_idx"),
+            # the invitation sender's queue, a small slice of a table that only grows
+            models.Index(
+                fields=["id"], condition=models.Q(email_sent=False, email_failed=False), name="invitation_unsent_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         """Return the email of the invitation."""
@@ -216,6 +254,12 @@ class InvitationLog(models.Model):
 
         verbose_name = "invitation log"
         verbose_name_plural = "invitation logs"
+        indexes = [
+            # pruning and the admin list, see the prune_records worker
+            models.Index(fields=["created_at"]),
+            # an organization's logs, newest first
+            models.Index(fields=["organization", "created_at"]),
+        ]
 
     def __str__(self) -> str:
         """Return the email of the invitation log."""
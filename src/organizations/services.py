@@ -1,8 +1,17 @@
 """Service objects for the organizations app."""
 
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
 from hashlib import sha256
 
-from organizations.models import Invitation, InvitationLog
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from myapp.notifications import notify
+from organizations.models import Invitation, InvitationLog, Organization, OrganizationMember
 
 
 def invite_log(invite: Invitation, message: str) -> None:
@@ -23,3 +32,283 @@ def invite_log(invite: Invitation, message: str) -> None:
         organization=invite.organization,
         message=message,
     )
+
+
+def bulk_invite_logs(invites: list[Invitation], message: str) -> None:
+    """Log the same message for many invitations in a single insert.
+
+    Args:
+    ----
+        invites: The invitation objects.
+        message: The message to log.
+
+    Returns:
+    -------
+        None
+
+    """
+    InvitationLog.objects.bulk_create(
+        InvitationLog(
+            email_hash=sha256(invite.email.encode()).hexdigest(),
+            organization_id=invite.organization_id,
+            message=message,
+        )
+        for invite in invites
+    )
+
+
+# most emails accepted by one bulk invite
+MAX_BULK_INVITES = 5000
+
+
+@dataclass
+class BulkInviteResult:
+    """The outcome of a bulk invite."""
+
+    invited: list[Invitation] = field(default_factory=list)
+    already_members: list[str] = field(default_factory=list)
+    already_invited: list[str] = field(default_factory=list)
+
+
+def bulk_invite(organization: Organization, invited_by: User, emails: list[str], role: str) -> BulkInviteResult:
+    """Invite many emails to an organization at once.
+
+    The emails are checked against existing members, invitations and user
+    accounts with one ``email__in`` query each, whatever their number. The
+    invitations and their logs are then inserted in one transaction, and
+    the invitation sender is woken up once it commits.
+
+    Args:
+    ----
+        organization: The organization to invite to.
+        invited_by: The user sending the invitations.
+        emails: Distinct, valid email addresses.
+        role: The role of every invitee.
+
+    Returns:
+    -------
+        BulkInviteResult: The invitations created and the emails skipped.
+
+    """
+    result = BulkInviteResult()
+
+    members = set(organization.members.filter(user__email__in=emails).values_list("user__email", flat=True))
+    invited = set(
+        Invitation.objects.filter(organization=organization, email__in=emails).values_list("email", flat=True)
+    )
+
+    new_emails = []
+    for email in emails:
+        if email in members:
+            result.already_members.append(email)
+        elif email in invited:
+            result.already_invited.append(email)
+        else:
+            new_emails.append(email)
+
+    # link invitees who already have an account, like Invitation.save() does one at a time
+    users = {}
+    for email, user_id in User.objects.filter(email__in=new_emails).order_by("pk").values_list("email", "pk"):
+        users.setdefault(email, user_id)
+
+    result.invited = [
+        Invitation(
+            organization=organization,
+            invited_by=invited_by,
+            user_id=users.get(email),
+            email=email,
+            role=role,
+            invite_key=uuid.uuid4(),
+        )
+        for email in new_emails
+    ]
+
+    if result.invited:
+        with transaction.atomic():
+            Invitation.objects.bulk_create(result.invited)
+            bulk_invite_logs(result.invited, "Invite created.")
+            # bulk_create sends no post_save, so wake the sender here
+            notify(Invitation)
+
+    return result
+
+
+# members per roster page on the organization detail page
+ROSTER_PAGE_SIZE = 50
+
+
+@dataclass(frozen=True)
+class RosterPage:
+    """A page of an organization's membership roster."""
+
+    members: list[OrganizationMember]
+    next_cursor: str | None
+
+
+def _roster_cursor(member: OrganizationMember) -> str:
+    return f"{member.role_rank}:{member.pk}"
+
+
+def _after_roster_cursor(cursor: str) -> Q:
+    """Return the filter for members after ``cursor``; a malformed cursor restarts the roster."""
+    rank_text, _, pk_text = cursor.partition(":")
+    if not rank_text.isdigit() or not pk_text.isdigit():
+        return Q()
+    rank, pk = int(rank_text), int(pk_text)
+    # the leading role_rank >= rank bounds the index range scan
+    return Q(role_rank__gte=rank) & (Q(role_rank__gt=rank) | Q(pk__gt=pk))
+
+
+def get_roster_page(
+    organization: Organization, cursor: str | None = None, page_size: int = ROSTER_PAGE_SIZE
+) -> RosterPage:
+    """Return a page of the roster, ordered by role and then by when the member joined.
+
+    Pages are addressed by a (role_rank, id) keyset cursor, which matches the
+    (organization, role_rank, id) index: every page is a range scan that
+    stops after ``page_size`` rows, however large the organization and
+    however deep into the roster the page is.
+
+    Args:
+    ----
+        organization: The organization whose members to list.
+        cursor: The ``next_cursor`` of the previous page, or None for the first page.
+        page_size: The number of members per page.
+
+    Returns:
+    -------
+        RosterPage: The members of the page and the cursor of the next one.
+
+    """
+    members = organization.members.select_related("user").order_by("role_rank", "pk")
+
+    if cursor:
+        members = members.filter(_after_roster_cursor(cursor))
+
+    page = list(members[: page_size + 1])
+    next_cursor = _roster_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return RosterPage(members=page[:page_size], next_cursor=next_cursor)
+
+
+# invitations per page of the pending invitations on the organization detail page
+INVITATION_PAGE_SIZE = 50
+
+
+@dataclass(frozen=True)
+class InvitationPage:
+    """A page of an organization's pending invitations, oldest first."""
+
+    invitations: list[Invitation]
+    next_cursor: str | None
+
+
+def get_invitation_page(
+    organization: Organization, cursor: str | None = None, page_size: int = INVITATION_PAGE_SIZE
+) -> InvitationPage:
+    """Return a page of the pending invitations, in the order they were sent.
+
+    Pages are addressed by an id keyset cursor, so each page is a range scan
+    of the (organization, id) index that stops after ``page_size`` rows,
+    however many invitations a bulk invite created.
+
+    Args:
+    ----
+        organization: The organization whose invitations to list.
+        cursor: The ``next_cursor`` of the previous page, or None for the first page.
+        page_size: The number of invitations per page.
+
+    Returns:
+    -------
+        InvitationPage: The invitations of the page and the cursor of the next one.
+
+    """
+    invitations = organization.invitations.order_by("pk")
+    # a malformed cursor restarts the list
+    if cursor and cursor.isdigit():
+        invitations = invitations.filter(pk__gt=int(cursor))
+
+    page = list(invitations[: page_size + 1])
+    next_cursor = str(page[page_size - 1].pk) if len(page) > page_size else None
+    return InvitationPage(invitations=page[:page_size], next_cursor=next_cursor)
+
+
+# log lines per page of the invitation log view
+INVITE_LOG_PAGE_SIZE = 100
+
+# rows fetched per round trip by the invitation log export
+INVITE_LOG_EXPORT_CHUNK_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class InviteLogPage:
+    """A page of an organization's invitation log, newest first."""
+
+    logs: list[InvitationLog]
+    next_cursor: str | None
+
+
+def _invite_log_cursor(log: InvitationLog) -> str:
+    return f"{log.created_at.isoformat()}|{log.pk}"
+
+
+def _before_invite_log_cursor(cursor: str) -> Q:
+    """Return the filter for logs older than ``cursor``; a malformed cursor restarts the log."""
+    created_at_text, _, pk = cursor.partition("|")
+    try:
+        created_at = datetime.fromisoformat(created_at_text)
+    except ValueError:
+        return Q()
+    if not pk.isdigit():
+        return Q()
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=int(pk))
+
+
+def get_invite_log_page(
+    organization: Organization, cursor: str | None = None, page_size: int = INVITE_LOG_PAGE_SIZE
+) -> InviteLogPage:
+    """Return a page of the invitation log, newest first.
+
+    Pages are addressed by a (created_at, id) keyset cursor, so each page is
+    a range scan of the (organization, created_at) index however old it is.
+
+    Args:
+    ----
+        organization: The organization whose log to list.
+        cursor: The ``next_cursor`` of the previous page, or None for the newest page.
+        page_size: The number of log lines per page.
+
+    Returns:
+    -------
+        InviteLogPage: The logs of the page and the cursor of the next one.
+
+    """
+    logs = organization.invitation_logs.order_by("-created_at", "-pk")
+    if cursor:
+        logs = logs.filter(_before_invite_log_cursor(cursor))
+
+    page = list(logs[: page_size + 1])
+    next_cursor = _invite_log_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return InviteLogPage(logs=page[:page_size], next_cursor=next_cursor)
+
+
+def iter_invite_logs(
+    organization: Organization, chunk_size: int = INVITE_LOG_EXPORT_CHUNK_SIZE
+) -> Iterator[tuple[datetime, str, str]]:
+    """Yield ``(created_at, email_hash, message)`` for the whole invitation log, oldest first.
+
+    Rows are fetched ``chunk_size`` at a time (with a server-side cursor on
+    PostgreSQL) and never cached on a queryset, so memory use does not
+    depend on the size of the log.
+
+    Args:
+    ----
+        organization: The organization whose log to export.
+        chunk_size: The number of rows fetched per round trip.
+
+    Returns:
+    -------
+        Iterator: The log lines.
+
+    """
+    logs = organization.invitation_logs.order_by("created_at", "pk").values_list("created_at", "email_hash", "message")
+    return logs.iterator(chunk_size=chunk_size)
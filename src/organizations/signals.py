@@ -0,0 +1,32 @@
+"""Signal receivers that keep the membership cache consistent."""
+
+from functools import partial
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from myapp.cache import clear_now_and_on_commit
+
+from .memberships import clear_all_memberships, clear_user_memberships
+from .models import Organization, OrganizationMember
+
+
+@receiver(post_save, sender=OrganizationMember)
+@receiver(post_delete, sender=OrganizationMember)
+def invalidate_user_memberships(sender, instance: OrganizationMember, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    """Drop the member's cached memberships, now and again on commit.
+
+    Only the bump on commit covers a request that reads the old rows before
+    the transaction commits: it stores them under the version that the bump
+    then retires.
+    """
+    clear_now_and_on_commit(partial(clear_user_memberships, instance.user_id))
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_all_memberships(sender, created: bool = False, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001, FBT001, FBT002
+    """Drop every cached membership when an organization changes; a new one has no members yet."""
+    if created:
+        return
+    clear_now_and_on_commit(clear_all_memberships)
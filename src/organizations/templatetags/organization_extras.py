@@ -16,6 +16,10 @@ register = template.Library()
 def get_user_role(organization: Organization, user: User) -> str | None:
     """Get the role of a user in an organization.
 
+    Uses the ``member_role`` annotation of ``OrganizationListView`` when it
+    belongs to the same user, then the user's ``org_memberships`` resolver,
+    and queries the membership otherwise.
+
     Args:
     ----
         organization: Organization object.
@@ -26,6 +30,14 @@ def get_user_role(organization: Organization, user: User) -> str | None:
         str: The role of the user in the organization.
 
     """
+    # the annotations only exist on organizations from OrganizationListView
+    if getattr(organization, "member_user_id", None) == user.pk:
+        return getattr(organization, "member_role", None)
+
+    memberships = getattr(user, "org_memberships", None)
+    if memberships is not None:
+        return memberships.role(organization)
+
     try:
         org_member = OrganizationMember.objects.get(organization=organization, user=user)
     except OrganizationMember.DoesNotExist:
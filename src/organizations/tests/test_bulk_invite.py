@@ -0,0 +1,125 @@
+"""Tests for bulk invitations."""
+
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from myapp.models import SiteConfiguration
+from organizations.forms import BulkInviteForm
+from organizations.models import Invitation, InvitationLog, Organization, OrganizationMember
+from organizations.services import bulk_invite
+
+Role = OrganizationMember.RoleChoices
+
+
+class BulkInviteServiceTests(TestCase):
+    """Bulk invite service tests."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        self.owner = User.objects.create(username="owner", email="owner@example.com")
+        OrganizationMember.objects.create(organization=self.organization, user=self.owner, role=Role.OWNER)
+        Invitation.objects.create(organization=self.organization, email="pending@example.com")
+        self.existing = User.objects.create(username="existing", email="existing@example.com")
+
+    def test_skips_members_and_pending_invitations(self):
+        emails = ["owner@example.com", "pending@example.com", "existing@example.com", "new@example.com"]
+
+        result = bulk_invite(self.organization, self.owner, emails, Role.MEMBER)
+
+        self.assertEqual([invite.email for invite in result.invited], ["existing@example.com", "new@example.com"])
+        self.assertEqual(result.already_members, ["owner@example.com"])
+        self.assertEqual(result.already_invited, ["pending@example.com"])
+        self.assertEqual(Invitation.objects.get(email="existing@example.com").user, self.existing)
+        self.assertIsNone(Invitation.objects.get(email="new@example.com").user)
+        self.assertEqual(InvitationLog.objects.filter(message="Invite created.").count(), 2)
+
+    def test_query_count_does_not_grow_with_the_list(self):
+        # small enough for a single insert per table on SQLite too
+        emails = [f"user{i}@example.com" for i in range(90)]
+
+        # members, invitations, users, then savepoint, invitation insert, log insert, release
+        with self.assertNumQueries(7):
+            result = bulk_invite(self.organization, self.owner, emails, Role.MEMBER)
+
+        self.assertEqual(len(result.invited), 90)
+        self.assertEqual(len({invite.invite_key for invite in result.invited}), 90)
+        self.assertTrue(all(isinstance(invite.invite_key, uuid.UUID) for invite in result.invited))
+
+
+class BulkInviteFormTests(TestCase):
+    """Bulk invite form tests."""
+
+    def test_collects_pasted_and_csv_emails_once(self):
+        csv_file = SimpleUploadedFile("invites.csv", b"name,email\nAmy,amy@example.com\nBob,bob@Example.COM\n")
+
+        form = BulkInviteForm(
+            {"emails": "bob@example.com, cat@example.com\namy@example.com", "role": Role.MEMBER},
+            {"csv_file": csv_file},
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["email_list"], ["bob@example.com", "cat@example.com", "amy@example.com"])
+
+    def test_rejects_invalid_emails(self):
+        form = BulkInviteForm({"emails": "amy@example.com not-an-email", "role": Role.MEMBER})
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("Invalid emails: not-an-email.", form.non_field_errors())
+
+    def test_owner_role_can_be_assigned(self):
+        # only owners reach the form
+        self.assertTrue(BulkInviteForm({"emails": "amy@example.com", "role": Role.OWNER}).is_valid())
+
+
+class BulkInviteViewTests(TestCase):
+    """Bulk invite view tests."""
+
+    def setUp(self):
+        SiteConfiguration.objects.get_or_create()
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.login(username="testuser", password="password")
+        self.member = OrganizationMember.objects.create(
+            organization=self.organization, user=self.user, role=Role.OWNER
+        )
+        self.url = reverse("organizations:bulk_invite", kwargs={"slug": self.organization.slug})
+
+    def test_get_renders_form(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "organizations/bulk_invite.html")
+
+    def test_post_invites_and_redirects(self):
+        response = self.client.post(self.url, {"emails": "amy@example.com\nbob@example.com", "role": Role.MEMBER})
+
+        self.assertRedirects(response, reverse("organizations:detail", kwargs={"slug": self.organization.slug}))
+        self.assertEqual(Invitation.objects.filter(organization=self.organization).count(), 2)
+
+    def test_admins_and_members_cannot_bulk_invite(self):
+        # the same policy as the single invite form
+        for role in (Role.ADMIN, Role.MEMBER):
+            with self.subTest(role=role):
+                self.member.role = role
+                self.member.save()
+
+                response = self.client.post(self.url, {"emails": "amy@example.com", "role": Role.MEMBER})
+
+                self.assertEqual(response.status_code, 403)
+                self.assertFalse(Invitation.objects.exists())
+
+    def test_only_owners_are_offered_bulk_invite(self):
+        detail = reverse("organizations:detail", kwargs={"slug": self.organization.slug})
+        for role, offered in ((Role.OWNER, True), (Role.ADMIN, False)):
+            with self.subTest(role=role):
+                self.member.role = role
+                self.member.save()
+
+                response = self.client.get(detail)
+
+                self.assertContains(response, "Invite to join")
+                self.assertEqual(self.url in response.content.decode(), offered)
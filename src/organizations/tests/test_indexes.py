@@ -0,0 +1,81 @@
+"""The hot organizations queries are planned on an index, checked with EXPLAIN."""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from organizations.models import Invitation, InvitationLog, Organization, OrganizationMember
+
+Role = OrganizationMember.RoleChoices
+
+
+class QueryPlanTests(TestCase):
+    """Query plan tests; they run on SQLite and on PostgreSQL."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        self.user = User.objects.create(username="testuser")
+        OrganizationMember.objects.create(organization=self.organization, user=self.user, role=Role.OWNER)
+
+        if connection.vendor == "postgresql":
+            # the test tables are tiny; make the planner show the index it would use on a large one
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def index_on(self, model, columns, *, unique=False):
+        """Return the name of the index of ``model`` on exactly ``columns``."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        for name, constraint in constraints.items():
+            if constraint["columns"] == columns and constraint["unique"] == unique and not constraint["primary_key"]:
+                return name
+        self.fail(f"No index on {model._meta.db_table} {columns}")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_membership_of_user_in_organization(self):
+        self.assertUsesIndex(
+            OrganizationMember.objects.filter(organization=self.organization, user=self.user),
+            self.index_on(OrganizationMember, ["organization_id", "user_id"], unique=True),
+        )
+
+    def test_memberships_of_user(self):
+        self.assertUsesIndex(
+            OrganizationMember.objects.filter(user=self.user),
+            self.index_on(OrganizationMember, ["user_id"]),
+        )
+
+    def test_members_by_role(self):
+        self.assertUsesIndex(self.organization.owners, "org_member_org_role_idx")
+
+    def test_roster_page(self):
+        self.assertUsesIndex(
+            self.organization.members.filter(role_rank__gte=1).order_by("role_rank", "pk")[:51],
+            "org_member_roster_idx",
+        )
+
+    def test_invitation_by_organization_and_email(self):
+        self.assertUsesIndex(
+            Invitation.objects.filter(organization=self.organization, email="new@example.com"),
+            "invitation_org_email_idx",
+        )
+
+    def test_unsent_invitations(self):
+        self.assertUsesIndex(
+            Invitation.objects.filter(email_sent=False, email_failed=False).order_by("pk"),
+            "invitation_unsent_idx",
+        )
+
+    def test_invitation_page(self):
+        self.assertUsesIndex(
+            self.organization.invitations.filter(pk__gt=1).order_by("pk")[:51],
+            "invitation_org_id_idx",
+        )
+
+    def test_invitation_logs_of_organization(self):
+        self.assertUsesIndex(
+            self.organization.invitation_logs.order_by("-created_at"),
+            self.index_on(InvitationLog, ["organization_id", "created_at"]),
+        )
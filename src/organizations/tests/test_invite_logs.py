@@ -0,0 +1,106 @@
+"""Tests for the paginated invitation log and its export."""
+
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.models import SiteConfiguration
+from organizations.models import InvitationLog, Organization, OrganizationMember
+from organizations.services import get_invite_log_page
+
+Role = OrganizationMember.RoleChoices
+
+
+class InviteLogPageTests(TestCase):
+    """Invitation log pagination service tests."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        logs = InvitationLog.objects.bulk_create(
+            InvitationLog(organization=self.organization, email_hash=f"hash{i}", message="Invite created.")
+            for i in range(7)
+        )
+        # pairs of logs share a timestamp, so pages must break ties on the id
+        start = timezone.now() - timedelta(days=1)
+        for i, log in enumerate(logs):
+            InvitationLog.objects.filter(pk=log.pk).update(created_at=start + timedelta(seconds=i // 2))
+
+    def walk(self, page_size):
+        hashes, cursor = [], None
+        while True:
+            page = get_invite_log_page(self.organization, cursor=cursor, page_size=page_size)
+            hashes.extend(log.email_hash for log in page.logs)
+            if page.next_cursor is None:
+                return hashes
+            cursor = page.next_cursor
+
+    def test_pages_cover_the_log_once_newest_first(self):
+        for page_size in (1, 2, 3, 7):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.walk(page_size), [f"hash{i}" for i in reversed(range(7))])
+
+    def test_malformed_cursor_restarts(self):
+        page = get_invite_log_page(self.organization, cursor="yesterday|x", page_size=2)
+
+        self.assertEqual([log.email_hash for log in page.logs], ["hash6", "hash5"])
+
+
+class InviteLogViewTests(TestCase):
+    """Invitation log view and export tests."""
+
+    def setUp(self):
+        SiteConfiguration.objects.get_or_create()
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.login(username="testuser", password="password")
+        self.member = OrganizationMember.objects.create(organization=self.organization, user=self.user, role=Role.ADMIN)
+        InvitationLog.objects.bulk_create(
+            InvitationLog(organization=self.organization, email_hash=f"hash{i}", message=f"line, {i}")
+            for i in range(3)
+        )
+
+    def export(self, export_format):
+        url = reverse(
+            "organizations:export_invite_logs",
+            kwargs={"slug": self.organization.slug, "export_format": export_format},
+        )
+        return self.client.get(url)
+
+    def test_page_links_to_older_lines(self):
+        url = reverse("organizations:invite_logs", kwargs={"slug": self.organization.slug})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "hash2")
+        self.assertIsNone(response.context["page"].next_cursor)
+
+    def test_csv_export_streams_every_line(self):
+        response = self.export("csv")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ["created_at", "email_hash", "message"])
+        self.assertEqual([row[1:] for row in rows[1:]], [[f"hash{i}", f"line, {i}"] for i in range(3)])
+
+    def test_ndjson_export_streams_every_line(self):
+        response = self.export("ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["email_hash"] for line in lines], ["hash0", "hash1", "hash2"])
+
+    def test_unknown_format_is_404(self):
+        self.assertEqual(self.export("xml").status_code, 404)
+
+    def test_members_cannot_export(self):
+        self.member.role = Role.MEMBER
+        self.member.save()
+
+        self.assertEqual(self.export("csv").status_code, 403)
@@ -0,0 +1,157 @@
+"""Tests for the request-scoped membership resolver."""
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from myapp.models import SiteConfiguration
+from organizations.memberships import _cache_key, clear_all_memberships, memberships_for, org_memberships_middleware
+from organizations.models import Organization, OrganizationMember
+from organizations.templatetags.organization_extras import get_user_role
+from organizations.tests.utils import LOCMEM_CACHES
+
+Role = OrganizationMember.RoleChoices
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MembershipResolverTests(TestCase):
+    """Membership resolver tests."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="testuser")
+        self.owned = Organization.objects.create(name="Owned", slug="owned")
+        self.joined = Organization.objects.create(name="Joined", slug="joined")
+        self.other = Organization.objects.create(name="Other", slug="other")
+        OrganizationMember.objects.create(organization=self.owned, user=self.user, role=Role.OWNER)
+        OrganizationMember.objects.create(organization=self.joined, user=self.user, role=Role.MEMBER)
+
+    def test_every_question_is_answered_from_one_query(self):
+        memberships_for(self.user)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.owned.is_owner(self.user))
+            self.assertTrue(self.owned.has_admin_permission(self.user))
+            self.assertFalse(self.joined.is_owner(self.user))
+            self.assertEqual(get_user_role(self.joined, self.user), Role.MEMBER)
+            self.assertIsNone(get_user_role(self.other, self.user))
+            self.assertEqual(self.user.org_memberships.get_or_404("owned").organization_id, self.owned.pk)
+
+    def test_unknown_slug_is_404(self):
+        with self.assertRaises(Http404):
+            memberships_for(self.user).get_or_404("other")
+
+    def test_anonymous_user_has_no_memberships(self):
+        anonymous = AnonymousUser()
+        memberships_for(anonymous)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.owned.is_owner(anonymous))
+
+    def test_clear_reloads(self):
+        memberships = memberships_for(self.user)
+        self.assertIsNone(memberships.role(self.other))
+
+        OrganizationMember.objects.create(organization=self.other, user=self.user, role=Role.ADMIN)
+        memberships.clear()
+
+        self.assertEqual(memberships.role(self.other), Role.ADMIN)
+
+
+class MembershipCacheTests(TransactionTestCase):
+    """Memberships are only cached outside transactions, so these tests run in autocommit."""
+
+    def setUp(self):
+        clear_all_memberships()
+        # user ids are reused after each test's flush, which sends no signals
+        self.addCleanup(clear_all_memberships)
+        self.user = User.objects.create(username="testuser")
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        self.member = OrganizationMember.objects.create(
+            organization=self.organization, user=self.user, role=Role.MEMBER
+        )
+
+    def role(self):
+        return memberships_for(User.objects.get(pk=self.user.pk)).role("test-org")
+
+    def test_memberships_are_cached_across_requests(self):
+        memberships_for(self.user).role("test-org")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(memberships_for(User(pk=self.user.pk)).role("test-org"), Role.MEMBER)
+
+    def test_membership_save_invalidates(self):
+        self.assertEqual(self.role(), Role.MEMBER)
+
+        self.member.role = Role.ADMIN
+        self.member.save()
+
+        self.assertEqual(self.role(), Role.ADMIN)
+
+    def test_membership_delete_invalidates(self):
+        self.assertEqual(self.role(), Role.MEMBER)
+
+        self.member.delete()
+
+        self.assertIsNone(self.role())
+
+    def test_read_racing_a_change_is_never_served(self):
+        # a request reads the old rows, then the change commits before it stores them
+        key = _cache_key(self.user.pk)
+        stale = {"test-org": (self.member.pk, self.organization.pk, Role.MEMBER, self.member.status)}
+        self.member.role = Role.ADMIN
+        self.member.save()
+        cache.set(key, stale)
+
+        self.assertEqual(self.role(), Role.ADMIN)
+
+    def test_organization_delete_invalidates(self):
+        self.assertEqual(self.role(), Role.MEMBER)
+
+        self.organization.delete()
+
+        self.assertIsNone(self.role())
+
+
+class MembershipMiddlewareTests(TestCase):
+    """The resolver is shared by the view and the invite form of a request."""
+
+    def setUp(self):
+        SiteConfiguration.objects.get_or_create()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.login(username="testuser", password="password")
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        OrganizationMember.objects.create(organization=self.organization, user=self.user, role=Role.OWNER)
+
+    def test_invite_post_reads_memberships_once(self):
+        url = reverse("organizations:invite", kwargs={"slug": self.organization.slug})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"email": "new@example.com", "role": Role.ADMIN})
+
+        self.assertEqual(response.status_code, 302)
+        membership_reads = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and "organizations_organizationmember" in query["sql"]
+        ]
+        # the invite form checks against existing members' emails once, on top of the resolver
+        self.assertEqual(len(membership_reads), 2)
+
+    def test_async_middleware_attaches_the_resolver(self):
+        response = HttpResponse()
+
+        async def get_response(request):
+            return response
+
+        middleware = org_memberships_middleware(get_response)
+        request = RequestFactory().get("/")
+        request.user = self.user
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertIs(async_to_sync(middleware)(request), response)
+        self.assertEqual(request.org_memberships.role(self.organization), Role.OWNER)
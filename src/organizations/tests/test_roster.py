@@ -0,0 +1,185 @@
+"""Tests for the keyset-paginated membership roster and pending invitations."""
+
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from myapp.models import SiteConfiguration
+from organizations.models import Invitation, Organization, OrganizationMember
+from organizations.services import get_invitation_page, get_roster_page
+from organizations.tests.utils import LOCMEM_CACHES
+
+Role = OrganizationMember.RoleChoices
+
+
+class RosterPageTests(TestCase):
+    """Roster pagination service tests."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        roles = {"zoe": Role.OWNER, "amy": Role.MEMBER, "bob": Role.ADMIN, "cat": Role.MEMBER, "dan": Role.OWNER}
+        for username, role in roles.items():
+            user = User.objects.create(username=username)
+            OrganizationMember.objects.create(organization=self.organization, user=user, role=role)
+
+    def walk(self, page_size):
+        usernames, cursor = [], None
+        while True:
+            page = get_roster_page(self.organization, cursor=cursor, page_size=page_size)
+            usernames.extend(member.user.username for member in page.members)
+            if page.next_cursor is None:
+                return usernames
+            cursor = page.next_cursor
+
+    def test_order_is_role_then_joining_order(self):
+        self.assertEqual(self.walk(page_size=10), ["zoe", "dan", "bob", "amy", "cat"])
+
+    def test_pages_cover_roster_once(self):
+        for page_size in (1, 2, 4, 5):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.walk(page_size), ["zoe", "dan", "bob", "amy", "cat"])
+
+    def test_rank_follows_role_changes(self):
+        OrganizationMember.objects.filter(user__username="cat").update(role=Role.OWNER)
+
+        self.assertEqual(self.walk(page_size=2), ["zoe", "cat", "dan", "bob", "amy"])
+
+    def test_last_full_page_has_no_cursor(self):
+        self.assertIsNone(get_roster_page(self.organization, page_size=5).next_cursor)
+
+    def test_page_is_a_single_query(self):
+        cursor = get_roster_page(self.organization, page_size=2).next_cursor
+
+        with self.assertNumQueries(1):
+            page = get_roster_page(self.organization, cursor=cursor, page_size=2)
+            [member.user.username for member in page.members]
+
+    def test_malformed_cursor_restarts_roster(self):
+        for cursor in ("garbage", "0:zoe", "-1:1"):
+            with self.subTest(cursor=cursor):
+                page = get_roster_page(self.organization, cursor=cursor, page_size=1)
+                self.assertEqual(page.members[0].user.username, "zoe")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RosterViewTests(TestCase):
+    """Roster view tests."""
+
+    def setUp(self):
+        SiteConfiguration.objects.get_or_create()
+
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.login(username="testuser", password="password")
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        OrganizationMember.objects.create(organization=self.organization, user=self.user, role=Role.OWNER)
+
+    def add_members(self, count, prefix="member"):
+        users = User.objects.bulk_create(User(username=f"{prefix}{i:03}") for i in range(count))
+        OrganizationMember.objects.bulk_create(
+            OrganizationMember(organization=self.organization, user=user) for user in users
+        )
+
+    def add_invitations(self, count, prefix="invitee"):
+        Invitation.objects.bulk_create(
+            Invitation(organization=self.organization, email=f"{prefix}{i:03}@example.com", invite_key=uuid.uuid4())
+            for i in range(count)
+        )
+
+    def test_detail_queries_do_not_grow_with_members(self):
+        url = reverse("organizations:detail", args=[self.organization.slug])
+        # warm process-level caches (e.g. the Site cache) so both measurements see the same state
+        self.client.get(url)
+
+        self.add_members(3, prefix="a")
+        self.add_invitations(3, prefix="a")
+        with CaptureQueriesContext(connection) as few_members:
+            self.client.get(url)
+
+        self.add_members(60, prefix="b")
+        self.add_invitations(60, prefix="b")
+        with self.assertNumQueries(len(few_members)):
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.context["roster"].members), 50)
+        self.assertEqual(len(response.context["invitations"].invitations), 50)
+        self.assertContains(response, reverse("organizations:roster", args=[self.organization.slug]))
+        self.assertContains(response, reverse("organizations:invitations", args=[self.organization.slug]))
+
+    def test_roster_endpoint_renders_next_page(self):
+        self.add_members(60)
+        first_page = self.client.get(reverse("organizations:detail", args=[self.organization.slug]))
+        cursor = first_page.context["roster"].next_cursor
+
+        response = self.client.get(
+            reverse("organizations:roster", args=[self.organization.slug]),
+            {"cursor": cursor},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "organizations/_roster_rows.html")
+        self.assertTemplateNotUsed(response, "organizations/base.html")
+        self.assertContains(response, "member059")
+        self.assertNotContains(response, "member048")
+        self.assertIsNone(response.context["roster"].next_cursor)
+
+    def test_roster_endpoint_requires_membership(self):
+        other = Organization.objects.create(name="Other Org", slug="other-org")
+
+        response = self.client.get(reverse("organizations:roster", args=[other.slug]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_invitations_endpoint_renders_next_page(self):
+        self.add_invitations(60)
+        first_page = self.client.get(reverse("organizations:detail", args=[self.organization.slug]))
+        cursor = first_page.context["invitations"].next_cursor
+
+        response = self.client.get(
+            reverse("organizations:invitations", args=[self.organization.slug]),
+            {"cursor": cursor},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "organizations/_invitation_rows.html")
+        self.assertTemplateNotUsed(response, "organizations/base.html")
+        self.assertContains(response, "invitee059@example.com")
+        self.assertNotContains(response, "invitee049@example.com")
+        self.assertIsNone(response.context["invitations"].next_cursor)
+
+    def test_invitations_endpoint_requires_admin(self):
+        OrganizationMember.objects.filter(user=self.user).update(role=Role.MEMBER)
+
+        response = self.client.get(reverse("organizations:invitations", args=[self.organization.slug]))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class InvitationPageTests(TestCase):
+    """Pending invitations pagination service tests."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        for email in ("one@example.com", "two@example.com", "three@example.com"):
+            Invitation.objects.create(organization=self.organization, email=email)
+
+    def walk(self, page_size):
+        emails, cursor = [], None
+        while True:
+            page = get_invitation_page(self.organization, cursor=cursor, page_size=page_size)
+            emails.extend(invite.email for invite in page.invitations)
+            if page.next_cursor is None:
+                return emails
+            cursor = page.next_cursor
+
+    def test_pages_cover_invitations_once_in_order(self):
+        for page_size in (1, 2, 3):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.walk(page_size), ["one@example.com", "two@example.com", "three@example.com"])
+
+    def test_malformed_cursor_restarts_list(self):
+        page = get_invitation_page(self.organization, cursor="garbage", page_size=1)
+        self.assertEqual(page.invitations[0].email, "one@example.com")
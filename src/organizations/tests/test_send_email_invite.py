@@ -0,0 +1,155 @@
+"""Tests for the batched invitation email sender."""
+
+import smtplib
+import uuid
+from unittest.mock import patch
+
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.models import CircuitBreaker, WorkerError
+from organizations.management.commands.send_email_invite import Command
+from organizations.models import Invitation, InvitationLog, Organization
+
+
+class SendEmailInviteTests(TestCase):
+    """Batched invitation sender tests."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Org", slug="test-org")
+        Invitation.objects.bulk_create(
+            Invitation(organization=self.organization, email=f"user{i}@example.com", invite_key=uuid.uuid4())
+            for i in range(25)
+        )
+        self.command = Command()
+
+    def configure(self, **custom):
+        self.command.config.custom = custom
+        self.command.config.save()
+
+    def test_sends_every_pending_invitation(self):
+        self.configure(batch_size=10)
+
+        self.command.run()
+
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertIn("Join the org: Test Org", mail.outbox[0].body)
+        self.assertFalse(Invitation.objects.filter(email_sent=False).exists())
+        self.assertEqual(InvitationLog.objects.filter(organization=self.organization).count(), 25)
+
+    def test_reuses_one_connection_per_batch(self):
+        self.configure(batch_size=10)
+
+        with patch(
+            "organizations.management.commands.send_email_invite.get_connection", wraps=get_connection
+        ) as mock_connection:
+            self.command.run()
+
+        self.assertEqual(mock_connection.call_count, 3)
+
+    def test_queries_per_batch_are_constant(self):
+        self.configure(batch_size=25)
+        Site.objects.get_current()
+        self.command.circuit_breaker("smtp")
+
+        # the breaker check, savepoint, claim, update, log insert and release, then the
+        # empty claim that ends the run
+        with self.assertNumQueries(9):
+            self.command.run()
+
+    def test_parallel_connections(self):
+        self.configure(batch_size=10, connections=3)
+
+        self.command.run()
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(f"user{i}@example.com" for i in range(25)))
+        self.assertFalse(Invitation.objects.filter(email_sent=False).exists())
+
+    def test_send_failure_marks_sent_invitations_and_stops(self):
+        self.configure(batch_size=10)
+        send_messages = EmailBackend.send_messages
+
+        def fail_on_user5(backend, messages):
+            if messages[0].to == ["user5@example.com"]:
+                raise ConnectionError("SMTP went away")
+            return send_messages(backend, messages)
+
+        with patch.object(EmailBackend, "send_messages", fail_on_user5):
+            # counts as an idle run, so the loop backs off
+            self.assertEqual(self.command.run(), 0)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(Invitation.objects.filter(email_sent=True).count(), 5)
+        self.assertEqual(InvitationLog.objects.count(), 5)
+        error = WorkerError.objects.get(worker=self.command.config)
+        self.assertIn("SMTP went away", error.error)
+        self.assertIn("ConnectionError", error.error)
+
+    def test_connections_must_be_positive(self):
+        self.configure(connections=0)
+
+        self.assertEqual(self.command._run_once(), 0)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn("must be at least 1", WorkerError.objects.get(worker=self.command.config).error)
+
+    def test_rejected_recipient_is_marked_and_the_batch_goes_on(self):
+        self.configure(batch_size=10)
+        send_messages = EmailBackend.send_messages
+
+        def reject_user5(backend, messages):
+            if messages[0].to == ["user5@example.com"]:
+                raise smtplib.SMTPRecipientsRefused({"user5@example.com": (550, b"No such user")})
+            return send_messages(backend, messages)
+
+        with patch.object(EmailBackend, "send_messages", reject_user5):
+            self.command.run()
+
+        self.assertEqual(len(mail.outbox), 24)
+        self.assertTrue(Invitation.objects.get(email="user5@example.com").email_failed)
+        self.assertFalse(Invitation.objects.filter(email_sent=False, email_failed=False).exists())
+        self.assertEqual(InvitationLog.objects.filter(message="Email rejected by the mail server.").count(), 1)
+        self.assertEqual(CircuitBreaker.objects.get(name="smtp").failures, 0)
+        self.assertFalse(WorkerError.objects.exists())
+
+    def test_permanent_rejection_of_the_message_is_marked(self):
+        with patch.object(EmailBackend, "send_messages", side_effect=smtplib.SMTPDataError(554, b"Rejected")):
+            self.command.run()
+
+        self.assertEqual(Invitation.objects.filter(email_failed=True).count(), 25)
+        self.assertEqual(CircuitBreaker.objects.get(name="smtp").failures, 0)
+
+    def test_temporary_rejection_counts_against_the_breaker(self):
+        with patch.object(EmailBackend, "send_messages", side_effect=smtplib.SMTPDataError(451, b"Try later")):
+            self.command.run()
+
+        self.assertFalse(Invitation.objects.filter(email_failed=True).exists())
+        self.assertEqual(CircuitBreaker.objects.get(name="smtp").failures, 1)
+
+    def test_open_breaker_skips_sending(self):
+        breaker = self.command.circuit_breaker("smtp")
+        CircuitBreaker.objects.filter(pk=breaker.pk).update(state=CircuitBreaker.STATE_OPEN, opened_at=timezone.now())
+
+        with patch("organizations.management.commands.send_email_invite.get_connection") as mock_connection:
+            self.assertEqual(self.command.run(), 0)
+
+        mock_connection.assert_not_called()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failures_open_the_breaker(self):
+        self.configure(batch_size=5)
+        CircuitBreaker.objects.create(name="smtp", failure_threshold=2)
+
+        with patch.object(EmailBackend, "send_messages", side_effect=ConnectionError("SMTP is down")):
+            self.command.run()
+            self.command.run()
+            self.assertEqual(self.command.run(), 0)
+
+        breaker = CircuitBreaker.objects.get(name="smtp")
+        self.assertEqual(breaker.state, CircuitBreaker.STATE_OPEN)
+        self.assertEqual(breaker.failures, 2)
+        self.assertIn("SMTP is down", breaker.last_error)
@@ -0,0 +1,4 @@
+"""Helpers shared by the organizations tests."""
+
+# query-count tests must not depend on CACHE_URL; a database cache would add its own queries
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
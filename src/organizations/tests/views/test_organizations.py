@@ -1,7 +1,9 @@
 """Tests for organizations app."""
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from myapp.models import SiteConfiguration
@@ -29,6 +31,31 @@ class OrganizationViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "organizations/index.html")
 
+    def test_index_view_shows_role_from_single_query(self):
+        """The role column is annotated, so more organizations cost no extra queries."""
+        with CaptureQueriesContext(connection) as single_org:
+            self.client.get(reverse("organizations:list"))
+
+        other_user = User.objects.create_user(username="otheruser", password="password")
+        for i in range(20):
+            organization = Organization.objects.create(name=f"Org {i}", slug=f"org-{i}")
+            OrganizationMember.objects.create(organization=organization, user=self.user)
+            # another member must not leak its role into this user's rows
+            OrganizationMember.objects.create(
+                organization=organization,
+                user=other_user,
+                role=OrganizationMember.RoleChoices.OWNER,
+            )
+
+        with self.assertNumQueries(len(single_org)):
+            response = self.client.get(reverse("organizations:list"))
+
+        roles = {org.slug: org.member_role for org in response.context["object_list"]}
+        self.assertEqual(len(roles), 21)
+        self.assertEqual(roles["test-org"], OrganizationMember.RoleChoices.OWNER)
+        self.assertEqual(roles["org-0"], OrganizationMember.RoleChoices.MEMBER)
+        self.assertContains(response, "<td>MEMBER</td>", count=20)
+
     def test_get_create_organization_view_with_permission(self):
         response = self.client.get(reverse("organizations:create_organization"))
         self.assertEqual(response.status_code, 200)
@@ -9,9 +9,17 @@ app_name = "organizations"
 urlpatterns = [
     path("create/", organizations.create_organization, name="create_organization"),
     path("<slug:slug>/", organizations.detail, name="detail"),
+    path("<slug:slug>/members/", organizations.roster, name="roster"),
+    path("<slug:slug>/invitations/", organizations.invitations, name="invitations"),
     path("<slug:slug>/invite/", members.invite_user, name="invite"),
+    path("<slug:slug>/invite/bulk/", members.bulk_invite_users, name="bulk_invite"),
     path("<slug:slug>/remove-member/", members.remove_member, name="remove_member"),
     path("<slug:slug>/invite-logs/", organizations.invite_logs, name="invite_logs"),
+    path(
+        "<slug:slug>/invite-logs/export.<str:export_format>",
+        organizations.export_invite_logs,
+        name="export_invite_logs",
+    ),
     path(
         "<slug:slug>/delete/",
         organizations.delete_organization,
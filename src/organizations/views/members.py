@@ -1,4 +1,5 @@
 import uuid
+from typing import cast
 
 from django.contrib import messages
 from django.contrib.auth import login
@@ -10,15 +11,17 @@ from django.views.decorators.http import require_http_methods
 
 from organizations.forms import (
     AcceptInviteChangePasswordForm,
+    BulkInviteForm,
     OrganizationInviteForm,
 )
+from organizations.memberships import MembershipRequest
 from organizations.models import Invitation, OrganizationMember
-from organizations.services import invite_log
+from organizations.services import bulk_invite, invite_log
 
 
 @login_required
 @require_http_methods(["POST"])
-def remove_member(request: HttpRequest, slug: str) -> HttpResponse:
+def remove_member(request: MembershipRequest, slug: str) -> HttpResponse:
     """Remove a member from an organization.
 
     Args:
@@ -35,7 +38,7 @@ def remove_member(request: HttpRequest, slug: str) -> HttpResponse:
     target = get_object_or_404(OrganizationMember, user_id=user_id)
 
     # requesting user must be a member of the organization, otherwise 404
-    org_member = get_object_or_404(OrganizationMember, organization__slug=slug, user=request.user)
+    org_member = request.org_memberships.get_or_404(slug)
 
     org = org_member.organization
 
@@ -63,7 +66,7 @@ def remove_member(request: HttpRequest, slug: str) -> HttpResponse:
 
 
 @login_required
-def invite_user(request: HttpRequest, slug: str) -> HttpResponse:
+def invite_user(request: MembershipRequest, slug: str) -> HttpResponse:
     """Invite a user to an organization.
 
     Args:
@@ -76,7 +79,7 @@ def invite_user(request: HttpRequest, slug: str) -> HttpResponse:
         HttpResponse object.
 
     """
-    org_member = get_object_or_404(OrganizationMember, organization__slug=slug, user=request.user)
+    org_member = request.org_memberships.get_or_404(slug)
 
     if not org_member.can_admin:
         messages.error(request, "You do not have permission to invite users.")
@@ -113,6 +116,57 @@ def invite_user(request: HttpRequest, slug: str) -> HttpResponse:
     )
 
 
+@login_required
+def bulk_invite_users(request: MembershipRequest, slug: str) -> HttpResponse:
+    """Invite a pasted list or a CSV file of emails to an organization.
+
+    Args:
+    ----
+        request: HttpRequest object.
+        slug: Slug of the organization.
+
+    Returns:
+    -------
+        HttpResponse object.
+
+    """
+    org_member = request.org_memberships.get_or_404(slug)
+    user = cast("User", request.user)
+
+    # the policy of OrganizationInviteForm.clean, so both invite paths agree
+    if not org_member.organization.has_admin_permission(user):
+        messages.error(request, "You do not have permission to invite users.")
+        return HttpResponse(status=403)
+
+    if request.method == "POST":
+        form = BulkInviteForm(request.POST, request.FILES)
+
+        if form.is_valid():
+            result = bulk_invite(
+                org_member.organization,
+                user,
+                form.cleaned_data["email_list"],
+                form.cleaned_data["role"],
+            )
+            messages.success(request, f"Invited {len(result.invited)} people to the organization.")
+            if result.already_members or result.already_invited:
+                messages.info(
+                    request,
+                    f"Skipped {len(result.already_members)} existing members "
+                    f"and {len(result.already_invited)} people already invited.",
+                )
+            return redirect("organizations:detail", slug=slug)
+
+    else:
+        form = BulkInviteForm()
+
+    return render(
+        request,
+        "organizations/bulk_invite.html",
+        {"form": form, "organization": org_member.organization},
+    )
+
+
 def accept_invite(request: HttpRequest, token: str) -> HttpResponse:
     """Accept an organization invite.
 
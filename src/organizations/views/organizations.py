@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import csv
+import json
 from typing import TYPE_CHECKING
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.db.models import F
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
 from django.views.generic import ListView
 
 from organizations.forms import (
@@ -14,10 +17,15 @@ from organizations.forms import (
     OrganizationForm,
 )
 from organizations.models import Organization, OrganizationMember
+from organizations.services import get_invitation_page, get_invite_log_page, get_roster_page, iter_invite_logs
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from django.db.models import QuerySet
 
+    from organizations.memberships import MembershipRequest
+
 
 class OrganizationListView(LoginRequiredMixin, ListView):
     """List view for organizations."""
@@ -26,8 +34,15 @@ class OrganizationListView(LoginRequiredMixin, ListView):
     template_name = "organizations/index.html"
 
     def get_queryset(self) -> QuerySet:
-        """Get queryset for the view."""
-        return self.model.objects.filter(members__user=self.request.user)
+        """Get the user's organizations, annotated with the user's role in each.
+
+        The annotations reuse the membership join of the filter, so the role
+        column in the template costs no query per row.
+        """
+        return self.model.objects.filter(members__user=self.request.user).annotate(
+            member_role=F("members__role"),
+            member_user_id=F("members__user_id"),
+        )
 
 
 @login_required
@@ -61,7 +76,7 @@ def create_organization(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
-def detail(request: HttpRequest, slug: str) -> HttpResponse:
+def detail(request: MembershipRequest, slug: str) -> HttpResponse:
     """Organization detail view.
 
     Args:
@@ -74,18 +89,73 @@ def detail(request: HttpRequest, slug: str) -> HttpResponse:
         HttpResponse object.
 
     """
-    org_member = get_object_or_404(OrganizationMember, organization__slug=slug, user=request.user)
+    org_member = request.org_memberships.get_or_404(slug)
 
     context = {
         "organization": org_member.organization,
         "org_member": org_member,
+        "roster": get_roster_page(org_member.organization),
     }
+    if org_member.can_admin:
+        context["invitations"] = get_invitation_page(org_member.organization)
 
     return render(request, "organizations/detail.html", context)
 
 
 @login_required
-def invite_logs(request: HttpRequest, slug: str) -> HttpResponse:
+def roster(request: MembershipRequest, slug: str) -> HttpResponse:
+    """Render the next page of the membership roster (HTMX partial).
+
+    Args:
+    ----
+        request: HttpRequest object.
+        slug: Slug of the organization.
+
+    Returns:
+    -------
+        HttpResponse object.
+
+    """
+    org_member = request.org_memberships.get_or_404(slug)
+
+    context = {
+        "organization": org_member.organization,
+        "org_member": org_member,
+        "roster": get_roster_page(org_member.organization, cursor=request.GET.get("cursor")),
+    }
+
+    return render(request, "organizations/_roster_rows.html", context)
+
+
+@login_required
+def invitations(request: MembershipRequest, slug: str) -> HttpResponse:
+    """Render the next page of the pending invitations (HTMX partial).
+
+    Args:
+    ----
+        request: HttpRequest object.
+        slug: Slug of the organization.
+
+    Returns:
+    -------
+        HttpResponse object.
+
+    """
+    org_member = request.org_memberships.get_or_404(slug)
+
+    if not org_member.can_admin:
+        return HttpResponse(status=403)
+
+    context = {
+        "organization": org_member.organization,
+        "invitations": get_invitation_page(org_member.organization, cursor=request.GET.get("cursor")),
+    }
+
+    return render(request, "organizations/_invitation_rows.html", context)
+
+
+@login_required
+def invite_logs(request: MembershipRequest, slug: str) -> HttpResponse:
     """View invitation logs for an organization.
 
     Args:
@@ -98,23 +168,79 @@ def invite_logs(request: HttpRequest, slug: str) -> HttpResponse:
         HttpResponse object.
 
     """
-    org_member = get_object_or_404(OrganizationMember, organization__slug=slug, user=request.user)
+    org_member = request.org_memberships.get_or_404(slug)
 
     if not org_member.can_admin:
         messages.error(request, "You do not have permission to view invite logs.")
         return HttpResponse(status=403)
 
-    logs = org_member.organization.invitation_logs.all()
-
     context = {
         "organization": org_member.organization,
-        "logs": logs,
+        "page": get_invite_log_page(org_member.organization, cursor=request.GET.get("cursor")),
     }
 
     return render(request, "organizations/invite_logs.html", context)
 
 
-def delete_organization(request: HttpRequest, slug: str) -> HttpResponse:
+class _Echo:
+    """A file-like object that returns what is written, for ``csv.writer``."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _invite_logs_csv(logs: Iterator[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(["created_at", "email_hash", "message"])
+    for created_at, email_hash, message in logs:
+        yield writer.writerow([created_at.isoformat(), email_hash, message])
+
+
+def _invite_logs_ndjson(logs: Iterator[tuple]) -> Iterator[str]:
+    for created_at, email_hash, message in logs:
+        yield json.dumps({"created_at": created_at.isoformat(), "email_hash": email_hash, "message": message}) + "\n"
+
+
+# export format -> (line renderer, content type)
+INVITE_LOG_EXPORTS = {
+    "csv": (_invite_logs_csv, "text/csv"),
+    "ndjson": (_invite_logs_ndjson, "application/x-ndjson"),
+}
+
+
+@login_required
+def export_invite_logs(
+    request: MembershipRequest, slug: str, export_format: str
+) -> HttpResponse | StreamingHttpResponse:
+    """Stream the whole invitation log of an organization as CSV or NDJSON.
+
+    Args:
+    ----
+        request: HttpRequest object.
+        slug: Slug of the organization.
+        export_format: "csv" or "ndjson".
+
+    Returns:
+    -------
+        StreamingHttpResponse with the export, or HttpResponse if forbidden.
+
+    """
+    if export_format not in INVITE_LOG_EXPORTS:
+        raise Http404
+
+    org_member = request.org_memberships.get_or_404(slug)
+
+    if not org_member.can_admin:
+        messages.error(request, "You do not have permission to view invite logs.")
+        return HttpResponse(status=403)
+
+    render_lines, content_type = INVITE_LOG_EXPORTS[export_format]
+    response = StreamingHttpResponse(render_lines(iter_invite_logs(org_member.organization)), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{slug}-invite-logs.{export_format}"'
+    return response
+
+
+def delete_organization(request: MembershipRequest, slug: str) -> HttpResponse:
     """Delete an organization.
 
     Args:
@@ -127,7 +253,7 @@ def delete_organization(request: HttpRequest, slug: str) -> HttpResponse:
         HttpResponse object.
 
     """
-    org_member = get_object_or_404(OrganizationMember, organization__slug=slug, user=request.user)
+    org_member = request.org_memberships.get_or_404(slug)
 
     if not org_member.is_owner:
         messages.error(request, "You do not have permission to delete this organization.")
@@ -6,3 +6,7 @@ class Require2FaConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "require2fa"
+
+    def ready(self) -> None:
+        """Connect the cache invalidation signals."""
+        from . import signals  # noqa: F401, PLC0415
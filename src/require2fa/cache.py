@@ -0,0 +1,96 @@
+"""Caching for the values Require2FAMiddleware checks on every request.
+
+``TwoFactorConfig.required`` only changes when an admin saves the
+configuration, and a user's MFA status only changes when an authenticator is
+added or removed. Both are kept in the default cache, so the middleware stays
+off the database (and, under ASGI, off the thread pool) on the hot path. With
+``myapp.cache.TieredCache`` as the default backend, reads are answered from
+process memory.
+
+The signals in ``signals.py`` clear the entries on change; TieredCache drops
+the local copies of every process within its generation check interval.
+"""
+
+from typing import TYPE_CHECKING
+
+from allauth.mfa.adapter import DefaultMFAAdapter
+from allauth.mfa.adapter import get_adapter as get_mfa_adapter
+from allauth.mfa.models import Authenticator
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from myapp.cache import can_cache_reads
+
+from .models import TwoFactorConfig
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import AbstractUser
+
+CONFIG_CACHE_KEY = "require2fa:config:required"
+MFA_CACHE_KEY = "require2fa:mfa:{user_id}"
+
+# seconds a user's MFA status is kept in the cache; the signals invalidate it sooner
+DEFAULT_MFA_CACHE_TIMEOUT = 300
+
+
+def _mfa_timeout() -> int:
+    return getattr(settings, "REQUIRE2FA_MFA_CACHE_TIMEOUT", DEFAULT_MFA_CACHE_TIMEOUT)
+
+
+def is_2fa_required() -> bool:
+    """Return whether 2FA is required site-wide, using the cache when possible."""
+    required = cache.get(CONFIG_CACHE_KEY)
+    if required is None:
+        required = TwoFactorConfig.get_solo().required
+        if can_cache_reads():
+            cache.set(CONFIG_CACHE_KEY, required)
+    return required
+
+
+async def ais_2fa_required() -> bool:
+    """Async version of ``is_2fa_required``; a TieredCache local hit never leaves the event loop."""
+    required = await cache.aget(CONFIG_CACHE_KEY)
+    if required is None:
+        config, _ = await TwoFactorConfig.objects.aget_or_create(pk=TwoFactorConfig.singleton_instance_id)
+        required = config.required
+        if can_cache_reads():
+            await cache.aset(CONFIG_CACHE_KEY, required)
+    return required
+
+
+def clear_config_cache() -> None:
+    """Drop the cached configuration."""
+    cache.delete(CONFIG_CACHE_KEY)
+
+
+def user_has_2fa(user: "AbstractUser") -> bool:
+    """Return whether the user has an MFA authenticator, using the cache when possible."""
+    key = MFA_CACHE_KEY.format(user_id=user.pk)
+    enabled = cache.get(key)
+    if enabled is None:
+        enabled = get_mfa_adapter().is_mfa_enabled(user)
+        if can_cache_reads():
+            cache.set(key, enabled, _mfa_timeout())
+    return enabled
+
+
+async def auser_has_2fa(user: "AbstractUser") -> bool:
+    """Async version of ``user_has_2fa``; a TieredCache local hit never leaves the event loop."""
+    key = MFA_CACHE_KEY.format(user_id=user.pk)
+    enabled = await cache.aget(key)
+    if enabled is None:
+        adapter = get_mfa_adapter()
+        if type(adapter).is_mfa_enabled is DefaultMFAAdapter.is_mfa_enabled:
+            # same query as DefaultMFAAdapter.is_mfa_enabled, through the async ORM
+            enabled = await Authenticator.objects.filter(user_id=user.pk).aexists()
+        else:
+            enabled = await sync_to_async(adapter.is_mfa_enabled)(user)
+        if can_cache_reads():
+            await cache.aset(key, enabled, _mfa_timeout())
+    return enabled
+
+
+def clear_user_2fa_cache(user_id: int) -> None:
+    """Drop the cached MFA status of a user."""
+    cache.delete(MFA_CACHE_KEY.format(user_id=user_id))
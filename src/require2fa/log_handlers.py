@@ -0,0 +1,20 @@
+"""Logging helpers for the require2fa security log."""
+
+import atexit
+import logging.handlers
+import queue
+
+
+class SecurityLogListener(logging.handlers.QueueListener):
+    """QueueListener that starts itself, for use as a ``listener`` in ``LOGGING``.
+
+    Paired with ``logging.handlers.QueueHandler``, records are put on a queue
+    by the caller and written by the listener thread, so logging a security
+    event from the async middleware never blocks the event loop on I/O.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, respect_handler_level: bool = False) -> None:
+        """Start the listener thread and stop it (flushing the queue) at exit."""
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.start()
+        atexit.register(self.stop)
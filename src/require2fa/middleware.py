@@ -2,7 +2,8 @@
 
 SECURITY CRITICAL: This middleware enforces 2FA for authenticated users.
 Previous versions used string prefix matching which allowed bypass via
-any /accounts/* URL. This version uses proper Django URL resolution.
+any /accounts/* URL. This version uses proper Django URL resolution, via a
+precompiled index of the exempt routes (see routes.py).
 
 See GitHub Issue #173 for vulnerability details.
 """
@@ -10,19 +11,17 @@ See GitHub Issue #173 for vulnerability details.
 import logging
 from typing import TYPE_CHECKING
 
-from allauth.mfa.adapter import get_adapter as get_mfa_adapter
-
 if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractUser
-from asgiref.sync import sync_to_async
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 from django.contrib import messages
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
-from django.urls import Resolver404, resolve
 from django.utils.decorators import sync_and_async_middleware
 
-from .models import TwoFactorConfig
+from .cache import ais_2fa_required, auser_has_2fa, is_2fa_required, user_has_2fa
+from .routes import ExemptRouteIndex
 
 # Set up security logging
 security_logger = logging.getLogger("security.2fa")
@@ -38,6 +37,12 @@ class Require2FAMiddleware:
     def __init__(self, get_response) -> None:  # noqa: ANN001, D107
         self.get_response = get_response
 
+        # Under ASGI get_response is a coroutine function: mark the instance as
+        # one too, so Django awaits it and __call__ dispatches to __acall__.
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
         # URL names that are exempt from 2FA - Django's actual routing
         self.exempt_url_names = {
             "account_login",
@@ -58,6 +63,9 @@ class Require2FAMiddleware:
             "mfa_download_recovery_codes",  # Download recovery codes
         }
 
+        # Exempt route indexes, built lazily per URLconf
+        self._route_indexes: dict[str, ExemptRouteIndex] = {}
+
     def _is_static_request(self, request: HttpRequest) -> bool:
         """Check if this is a static file request using Django's settings."""
         static_url = getattr(settings, "STATIC_URL", "/static/")
@@ -76,9 +84,19 @@ class Require2FAMiddleware:
         return request.path.startswith((static_url, media_url))
 
     def _user_has_2fa(self, user: "AbstractUser") -> bool:
-        """Check if user has 2FA enabled."""
-        mfa_adapter = get_mfa_adapter()
-        return mfa_adapter.is_mfa_enabled(user)
+        """Check if user has 2FA enabled (cached per user, see cache.py)."""
+        return user_has_2fa(user)
+
+    def _get_route_index(self, request: HttpRequest) -> ExemptRouteIndex:
+        """Return the exempt route index for the URLconf serving this request."""
+        urlconf = getattr(request, "urlconf", None) or settings.ROOT_URLCONF
+
+        route_index = self._route_indexes.get(urlconf)
+        if route_index is None:
+            route_index = ExemptRouteIndex(self.exempt_url_names, urlconf)
+            self._route_indexes[urlconf] = route_index
+
+        return route_index
 
     def _is_exempt_url(self, request: HttpRequest) -> bool:
         """Check if current URL is exempt from 2FA by name."""
@@ -86,16 +104,8 @@ class Require2FAMiddleware:
         resolver_match = getattr(request, "resolver_match", None)
 
         if not resolver_match:
-            try:
-                resolver_match = resolve(request.path_info)
-            except Resolver404:
-                # Can't resolve = probably 404 = let it through
-                security_logger.debug("2FA: path %s doesn't resolve, allowing", request.path)
-                return True
-            except Exception as resolution_error:  # noqa: BLE001
-                # Unexpected error during resolution - log and don't exempt
-                security_logger.warning("2FA: error resolving path %s: %s", request.path, str(resolution_error))
-                return False
+            # Exempt URL names and paths that don't resolve (404s) are let through
+            return self._get_route_index(request).is_exempt(request.path_info)
 
         # Check by URL name
         if resolver_match.url_name in self.exempt_url_names:
@@ -121,44 +131,51 @@ class Require2FAMiddleware:
         if not request.user.is_authenticated:
             return False
 
-        # Skip exempt URLs
-        if self._is_exempt_url(request):
+        # Check if 2FA is required by site configuration (cached, see cache.py).
+        # This runs before the exempt URL check so URL resolution is skipped
+        # entirely while enforcement is switched off.
+        if not is_2fa_required():
             return False
 
-        # Check if 2FA is required by site configuration
-        config = TwoFactorConfig.objects.get()
-        if not config.required:
+        # Skip exempt URLs
+        if self._is_exempt_url(request):
             return False
 
         # Check if user has 2FA
         return not self._user_has_2fa(request.user)
 
     async def _should_enforce_2fa_async(self, request: HttpRequest) -> bool:
-        """Async version: Check if 2FA should be enforced for this request."""
+        """Async version: Check if 2FA should be enforced for this request.
+
+        Runs entirely on the event loop while the cache is warm: the user comes
+        from ``request.auser()`` and the cached checks only await on a miss.
+        """
         # Skip static/media files
         if self._is_static_request(request):
             return False
 
         # Skip if user not authenticated
-        if not request.user.is_authenticated:
+        user = await request.auser()
+        if not user.is_authenticated:
             return False
 
-        # Skip exempt URLs
-        if self._is_exempt_url(request):
+        # Check if 2FA is required by site configuration (cached, see cache.py)
+        if not await ais_2fa_required():
             return False
 
-        # Check if 2FA is required by site configuration
-        config = await sync_to_async(TwoFactorConfig.objects.get)()
-        if not config.required:
+        # Skip exempt URLs
+        if self._is_exempt_url(request):
             return False
 
         # Check if user has 2FA
-        has_2fa = await sync_to_async(self._user_has_2fa)(request.user)
-        return not has_2fa
+        return not await auser_has_2fa(user)
 
     # Sync version
     def __call__(self, request: HttpRequest) -> HttpResponse:
         """Process the request and enforce 2FA if required."""
+        if self.async_mode:
+            return self.__acall__(request)  # type: ignore[return-value]
+
         if not self._should_enforce_2fa(request):
             return self.get_response(request)
 
@@ -182,18 +199,19 @@ class Require2FAMiddleware:
         if not await self._should_enforce_2fa_async(request):
             return await self.get_response(request)
 
-        # User needs 2FA - log and redirect
-        await sync_to_async(security_logger.warning)(
+        # User needs 2FA - log and redirect. Neither call blocks: the security
+        # logger writes through a queue (see log_handlers.py) and messages are
+        # only queued on the request until the response is processed.
+        user = await request.auser()
+        security_logger.warning(
             "2FA required but not configured for user: %s accessing: %s",
-            getattr(request.user, "id", "unknown"),
+            getattr(user, "id", "unknown"),
             request.path,
         )
 
         # Don't redirect if we're already going to 2FA setup to avoid loops
         if not request.path.startswith("/accounts/2fa/"):
-            await sync_to_async(messages.warning)(
-                request, "Two-factor authentication is required. Please set it up now."
-            )
+            messages.warning(request, "Two-factor authentication is required. Please set it up now.")
             return redirect("/accounts/2fa/")
 
         return await self.get_response(request)
@@ -0,0 +1,99 @@
+"""Precompiled index of the URL routes that are exempt from 2FA.
+
+Running ``django.urls.resolve()`` from middleware walks the whole URLconf,
+including every allauth route, on each request. The index below is built once
+per URLconf from the exempt URL names and answers most requests with a single
+regex match plus an LRU lookup:
+
+* A path that matches another route but none of the exempt route patterns
+  can never resolve to an exempt view, so it is not exempt and no resolver
+  walk is needed.
+* Any other path is confirmed with ``resolve()``, which remains the
+  authority, so shadowing routes and converters are honoured exactly.
+  Paths that do not resolve (404s such as ``/favicon.ico`` or scanner probes)
+  are exempt: there is no view behind them to protect.
+
+Verdicts are kept in an LRU keyed by path.
+"""
+
+import logging
+import re
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+from django.urls import Resolver404, URLPattern, URLResolver, get_resolver, resolve
+
+security_logger = logging.getLogger("security.2fa")
+
+VERDICT_CACHE_SIZE = 2048
+
+# named groups are irrelevant for matching and may collide once patterns are joined
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+
+
+def _iter_routes(resolver: URLResolver, prefix: str, namespace: str) -> Iterator[tuple[str, str | None, str]]:
+    """Yield ``(regex, url_name, namespace)`` for every endpoint below ``resolver``."""
+    for pattern in resolver.url_patterns:
+        regex = prefix + pattern.pattern.regex.pattern.removeprefix("^")
+
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                child_namespace = f"{namespace}:{pattern.namespace}" if namespace else pattern.namespace
+            yield from _iter_routes(pattern, regex, child_namespace)
+        elif isinstance(pattern, URLPattern):
+            yield regex, pattern.name, namespace
+
+
+def _is_exempt_name(url_name: str | None, namespace: str | None, exempt_url_names: frozenset[str]) -> bool:
+    if url_name in exempt_url_names:
+        return True
+    return bool(namespace and url_name and f"{namespace}:{url_name}" in exempt_url_names)
+
+
+def _compile(regexes: Iterable[str]) -> re.Pattern[str] | None:
+    """Join route regexes into one pattern, or return None if there are none."""
+    alternatives = [f"(?:{_NAMED_GROUP.sub('(?:', regex)})" for regex in regexes]
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+class ExemptRouteIndex:
+    """Decide whether a path is exempt from 2FA for a given URLconf."""
+
+    def __init__(self, exempt_url_names: Iterable[str], urlconf: str | None = None) -> None:
+        """Compile the exempt routes of ``urlconf`` into a single pattern."""
+        self.exempt_url_names = frozenset(exempt_url_names)
+        self.urlconf = urlconf
+
+        root = get_resolver(urlconf)
+        routes = list(_iter_routes(root, "^" + root.pattern.regex.pattern.removeprefix("^"), ""))
+        self.pattern = _compile(
+            regex
+            for regex, url_name, namespace in routes
+            if _is_exempt_name(url_name, namespace, self.exempt_url_names)
+        )
+        self.routes_pattern = _compile(regex for regex, _, _ in routes)
+
+        self.is_exempt = lru_cache(maxsize=VERDICT_CACHE_SIZE)(self._is_exempt)
+
+    def _is_exempt(self, path_info: str) -> bool:
+        """Return True if ``path_info`` resolves to an exempt URL name, or does not resolve at all."""
+        could_be_exempt = self.pattern is not None and self.pattern.fullmatch(path_info)
+        if not could_be_exempt and self.routes_pattern is not None and self.routes_pattern.fullmatch(path_info):
+            return False
+
+        try:
+            resolver_match = resolve(path_info, self.urlconf)
+        except Resolver404:
+            # Can't resolve = 404 = let it through
+            security_logger.debug("2FA: path %s doesn't resolve, allowing", path_info)
+            return True
+        except Exception as resolution_error:  # noqa: BLE001
+            # Unexpected error during resolution - log and don't exempt
+            security_logger.warning("2FA: error resolving path %s: %s", path_info, str(resolution_error))
+            return False
+
+        exempt = _is_exempt_name(resolver_match.url_name, resolver_match.namespace, self.exempt_url_names)
+        if exempt:
+            security_logger.debug("2FA exemption: URL name '%s' for %s", resolver_match.view_name, path_info)
+        return exempt
@@ -0,0 +1,38 @@
+"""Signal receivers that keep the require2fa caches consistent."""
+
+from functools import partial
+
+from allauth.mfa.models import Authenticator
+from allauth.mfa.signals import authenticator_added, authenticator_removed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from myapp.cache import clear_now_and_on_commit
+
+from .cache import clear_config_cache, clear_user_2fa_cache
+from .models import TwoFactorConfig
+
+
+@receiver(post_save, sender=TwoFactorConfig)
+@receiver(post_delete, sender=TwoFactorConfig)
+def invalidate_config_cache(sender, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    """Clear the cached configuration when it changes."""
+    clear_now_and_on_commit(clear_config_cache)
+
+
+@receiver(authenticator_added)
+@receiver(authenticator_removed)
+def invalidate_user_2fa_cache(sender, user, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    """Clear a user's cached MFA status when allauth adds or removes an authenticator."""
+    clear_now_and_on_commit(partial(clear_user_2fa_cache, user.pk))
+
+
+@receiver(post_save, sender=Authenticator)
+@receiver(post_delete, sender=Authenticator)
+def invalidate_user_2fa_cache_on_write(sender, instance, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    """Clear a user's cached MFA status on any authenticator write.
+
+    This covers changes that bypass the allauth signals, such as deleting an
+    authenticator from the Django admin.
+    """
+    clear_now_and_on_commit(partial(clear_user_2fa_cache, instance.user_id))
@@ -0,0 +1,103 @@
+"""Tests for the caches used by the 2FA middleware."""
+
+from allauth.mfa.models import Authenticator
+from allauth.mfa.signals import authenticator_added
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from require2fa.cache import clear_config_cache, clear_user_2fa_cache, is_2fa_required, user_has_2fa
+from require2fa.models import TwoFactorConfig
+
+User = get_user_model()
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class ConfigCacheTest(TransactionTestCase):
+    """The cache is only populated outside transactions, so these tests run in autocommit."""
+
+    def setUp(self):
+        clear_config_cache()
+        self.addCleanup(clear_config_cache)
+        self.config = TwoFactorConfig.get_solo()
+        self.config.required = True
+        self.config.save()
+
+    def test_repeated_reads_do_not_query(self):
+        """Once cached, the configuration is served without touching the database."""
+        self.assertTrue(is_2fa_required())
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_2fa_required())
+
+    def test_save_invalidates_cache(self):
+        """Saving the configuration is visible on the next read."""
+        self.assertTrue(is_2fa_required())
+
+        self.config.required = False
+        self.config.save()
+
+        self.assertFalse(is_2fa_required())
+
+    def test_queryset_update_is_picked_up_after_clear(self):
+        """Writes that bypass signals are only visible once the cache is cleared."""
+        self.assertTrue(is_2fa_required())
+
+        TwoFactorConfig.objects.update(required=False)
+        self.assertTrue(is_2fa_required())
+
+        clear_config_cache()
+        self.assertFalse(is_2fa_required())
+
+
+class ConfigCacheTransactionTest(TestCase):
+    """Values read inside a transaction may be rolled back and must not be cached."""
+
+    def test_no_caching_inside_atomic_block(self):
+        clear_config_cache()
+        config = TwoFactorConfig.get_solo()
+        config.required = True
+        config.save()
+
+        self.assertTrue(is_2fa_required())
+
+        TwoFactorConfig.objects.update(required=False)
+        self.assertFalse(is_2fa_required())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserMFACacheTest(TransactionTestCase):
+    """The per-user MFA status is cached and dropped when authenticators change."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username="mfauser", email="mfa@example.com", password="testpass123")
+        self.addCleanup(clear_user_2fa_cache, self.user.pk)
+
+    def test_repeated_reads_do_not_query(self):
+        self.assertFalse(user_has_2fa(self.user))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(user_has_2fa(self.user))
+
+    def test_authenticator_added_signal_invalidates(self):
+        self.assertFalse(user_has_2fa(self.user))
+
+        # write without model signals, then notify the way allauth does
+        Authenticator.objects.bulk_create(
+            [Authenticator(user=self.user, type=Authenticator.Type.TOTP, data={})]
+        )
+        self.assertFalse(user_has_2fa(self.user))
+
+        authenticator_added.send(sender=Authenticator, request=None, user=self.user, authenticator=None)
+        self.assertTrue(user_has_2fa(self.user))
+
+    def test_deleting_authenticator_invalidates(self):
+        """Deleting an authenticator outside allauth (e.g. from the admin) re-enables enforcement."""
+        authenticator = Authenticator.objects.create(user=self.user, type=Authenticator.Type.TOTP, data={})
+        self.assertTrue(user_has_2fa(self.user))
+
+        authenticator.delete()
+        self.assertFalse(user_has_2fa(self.user))
@@ -1,10 +1,16 @@
 """Integration test suite for 2FA middleware security."""
 
 from unittest.mock import patch
+
+from asgiref.sync import iscoroutinefunction
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client, override_settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, Client, override_settings
 from django.urls import reverse
 
+from require2fa.cache import clear_config_cache, clear_user_2fa_cache
+from require2fa.middleware import Require2FAMiddleware
 from require2fa.models import TwoFactorConfig
 
 User = get_user_model()
@@ -94,6 +100,15 @@ class Require2FAMiddlewareIntegrationTest(TestCase):
                 if response.status_code == 302:
                     self.assertNotEqual(response.url, "/accounts/2fa/")
 
+    def test_unresolvable_paths_are_not_redirected_or_logged(self):
+        """404s (favicons, scanner probes) are let through without a security warning."""
+        self.client.force_login(self.user)
+
+        with self.assertNoLogs("security.2fa", level="WARNING"):
+            response = self.client.get("/favicon.ico")
+
+        self.assertEqual(response.status_code, 404)
+
     def test_2fa_disabled_site_wide_allows_everything(self):
         """When 2FA is disabled, middleware should not interfere."""
         # Disable 2FA site-wide
@@ -320,3 +335,58 @@ class ConfigurationSecurityTest(TestCase):
         # Proper media paths should be treated as static
         self.assertTrue(is_media_static,
                        "Proper media paths should be treated as static file requests")
+
+
+class AsyncMiddlewareTest(TransactionTestCase):
+    """The ASGI path enforces 2FA natively, without thread hops once the cache is warm."""
+
+    def setUp(self):
+        clear_config_cache()
+        self.addCleanup(clear_config_cache)
+        self.user = User.objects.create_user(username="asyncuser", email="async@example.com", password="testpass123")
+        self.addCleanup(clear_user_2fa_cache, self.user.pk)
+        config = TwoFactorConfig.get_solo()
+        config.required = True
+        config.save()
+
+    async def _get_response(self, request):
+        return HttpResponse("OK")
+
+    def _request(self, path):
+        request = AsyncRequestFactory().get(path)
+        user = self.user
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        request._messages = CookieStorage(request)
+        return request
+
+    def test_middleware_runs_in_async_mode(self):
+        middleware = Require2FAMiddleware(self._get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+    async def test_user_without_2fa_redirected(self):
+        middleware = Require2FAMiddleware(self._get_response)
+
+        response = await middleware(self._request("/"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "/accounts/2fa/")
+
+    async def test_exempt_url_passes_through(self):
+        middleware = Require2FAMiddleware(self._get_response)
+
+        response = await middleware(self._request("/accounts/logout/"))
+
+        self.assertEqual(response.status_code, 200)
+
+    async def test_warm_cache_makes_no_thread_hops(self):
+        middleware = Require2FAMiddleware(self._get_response)
+        await middleware(self._request("/"))
+
+        with patch("asgiref.sync.SyncToAsync.__call__", side_effect=AssertionError("thread hop")):
+            response = await middleware(self._request("/"))
+
+        self.assertEqual(response.url, "/accounts/2fa/")
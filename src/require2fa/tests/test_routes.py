@@ -0,0 +1,51 @@
+"""Tests for the precompiled exempt route index."""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import resolve
+
+from require2fa.routes import ExemptRouteIndex
+
+EXEMPT_URL_NAMES = {"account_login", "account_logout", "account_confirm_email", "mfa_activate_totp"}
+
+
+class ExemptRouteIndexTest(SimpleTestCase):
+    """The index must agree with URL resolution while avoiding it where possible."""
+
+    def setUp(self):
+        self.index = ExemptRouteIndex(EXEMPT_URL_NAMES)
+
+    def test_exempt_routes(self):
+        for path in ["/accounts/login/", "/accounts/logout/", "/accounts/2fa/totp/activate/"]:
+            with self.subTest(path=path):
+                self.assertTrue(self.index.is_exempt(path))
+
+    def test_exempt_route_with_arguments(self):
+        self.assertTrue(self.index.is_exempt("/accounts/confirm-email/abc:123/"))
+
+    def test_protected_routes_skip_resolution(self):
+        """Paths outside the exempt patterns are decided without a resolver walk."""
+        with patch("require2fa.routes.resolve") as mock_resolve:
+            for path in ["/", "/admin/", "/accounts/email/", "/organizations/some-org/"]:
+                with self.subTest(path=path):
+                    self.assertFalse(self.index.is_exempt(path))
+            mock_resolve.assert_not_called()
+
+    def test_unresolvable_paths_are_exempt(self):
+        """A 404 has no view to protect, so it is not redirected to the 2FA setup."""
+        for path in ["/favicon.ico", "/does-not-exist/", "/accounts/login/../admin/", "/accounts//login/"]:
+            with self.subTest(path=path):
+                self.assertTrue(self.index.is_exempt(path))
+
+
+    def test_verdicts_are_cached(self):
+        with patch("require2fa.routes.resolve", wraps=resolve) as mock_resolve:
+            self.assertTrue(self.index.is_exempt("/accounts/login/"))
+            self.assertTrue(self.index.is_exempt("/accounts/login/"))
+        mock_resolve.assert_called_once()
+
+    def test_namespaced_names(self):
+        index = ExemptRouteIndex({"organizations:list"})
+        self.assertTrue(index.is_exempt("/organizations/"))
+        self.assertFalse(index.is_exempt("/organizations/create/"))